@@ -1,7 +1,12 @@
+from functools import lru_cache
+from typing import Dict, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 class JiraConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     base_url: str
     username: str
     api_token: str
@@ -12,6 +17,8 @@ class JiraConfig(BaseModel):
     context_detail_level: str = 'medium'  # 'low', 'medium', 'high'
 
 class LLMProviderConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     api_key: str
     base_url: str
     model: str
@@ -21,7 +28,7 @@ class LLMProviderConfig(BaseModel):
     retry_attempts: int = 3
 
 class AppConfig(BaseSettings):
-    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='allow')
+    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='allow', frozen=True)
     
     # Mode settings
     MODE: str = 'online'  # 'online' or 'local'
@@ -39,7 +46,22 @@ class AppConfig(BaseSettings):
     CUSTOM_API_KEY: str = ''
     CUSTOM_ENDPOINT: str = ''
 
+    # Validated provider configs, built once per instance on first access
+    _jira_config: Optional[JiraConfig] = PrivateAttr(default=None)
+    _llm_configs: Dict[Optional[str], LLMProviderConfig] = PrivateAttr(default_factory=dict)
+
     def get_jira_config(self) -> JiraConfig:
+        if self._jira_config is None:
+            self._jira_config = self._build_jira_config()
+        return self._jira_config
+
+    def get_llm_config(self, provider: str = "ollama") -> LLMProviderConfig:
+        llm_config = self._llm_configs.get(provider)
+        if llm_config is None:
+            llm_config = self._llm_configs[provider] = self._build_llm_config(provider)
+        return llm_config
+
+    def _build_jira_config(self) -> JiraConfig:
         # For local mode, use dummy values
         if self.MODE == 'local':
             return JiraConfig(
@@ -61,37 +83,60 @@ class AppConfig(BaseSettings):
             context_detail_level=self.JIRA_CONTEXT_DETAIL_LEVEL
         )
 
-    def get_llm_config(self, provider: str = "ollama") -> LLMProviderConfig:
-        if provider == "openai":
-            return LLMProviderConfig(
-                api_key=self.OPENAI_API_KEY,
-                base_url="https://api.openai.com/v1",
-                model="gpt-4"
-            )
-        elif provider == "ollama":
-            return LLMProviderConfig(
-                api_key="",
-                base_url="http://localhost:11434",
-                model="llama3.2"
-            )
-        elif provider == "custom" and self.CUSTOM_ENDPOINT:
-            return LLMProviderConfig(
-                api_key=self.CUSTOM_API_KEY,
-                base_url=self.CUSTOM_ENDPOINT,
-                model="custom-model"
-            )
-        else:
-            # Default to ollama if custom provider is not properly configured
-            return LLMProviderConfig(
-                api_key="",
-                base_url="http://localhost:11434",
-                model="llama3.2"
-            )
+    def _build_llm_config(self, provider: str) -> LLMProviderConfig:
+        factory = _LLM_PROVIDER_FACTORIES.get(provider)
+        llm_config = factory(self) if factory else None
+        if llm_config is None:
+            # Default to ollama if the provider is unknown or not properly configured
+            llm_config = self.get_llm_config("ollama")
+        return llm_config
 
-config = AppConfig()
+# Provider name -> factory building its LLMProviderConfig from the app settings.
+# A factory returns None when the provider is not configured.
+_LLM_PROVIDER_FACTORIES = {
+    "openai": lambda settings: LLMProviderConfig(
+        api_key=settings.OPENAI_API_KEY,
+        base_url="https://api.openai.com/v1",
+        model="gpt-4"
+    ),
+    "ollama": lambda settings: LLMProviderConfig(
+        api_key="",
+        base_url="http://localhost:11434",
+        model="llama3.2"
+    ),
+    "custom": lambda settings: LLMProviderConfig(
+        api_key=settings.CUSTOM_API_KEY,
+        base_url=settings.CUSTOM_ENDPOINT,
+        model="custom-model"
+    ) if settings.CUSTOM_ENDPOINT else None,
+}
 
+def __getattr__(name: str):
+    # Build the shared AppConfig (and read .env) only when first requested
+    if name == "config":
+        return _get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _get_config() -> AppConfig:
+    app_config = globals().get("config")
+    if app_config is None:
+        app_config = globals()["config"] = AppConfig()
+    return app_config
+
+@lru_cache(maxsize=1)
 def get_jira_config() -> JiraConfig:
-    return config.get_jira_config()
+    return _get_config().get_jira_config()
 
+@lru_cache(maxsize=8)
 def get_llm_config(provider: str = "ollama") -> LLMProviderConfig:
-    return config.get_llm_config(provider)
+    return _get_config().get_llm_config(provider)
+
+def clear_config_cache() -> None:
+    """Drop cached configs so the next access re-reads the current settings."""
+    get_jira_config.cache_clear()
+    get_llm_config.cache_clear()
+    app_config = globals().get("config")
+    if app_config is not None:
+        app_config._jira_config = None
+        app_config._llm_configs.clear()
+
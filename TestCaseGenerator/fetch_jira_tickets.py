@@ -2,140 +2,126 @@
 """Fetch Jira Stories and Generate Test Cases with plain description - Fixed imports."""
 
 import asyncio
+import json
+import logging
 import os
+import re
 import sys
 from pathlib import Path
-import httpx
 
-# Add project root to Python path to fix import issues
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+try:
+    # orjson decodes Jira responses several times faster than the stdlib
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
 
-# Now import with absolute paths
+# Import the same top-level modules the rest of the package uses, so that
+# config.settings is only ever loaded once (not also as TestCaseGenerator.config.settings)
 try:
-    from TestCaseGenerator.integrations.jira_client import JiraClient
-    from TestCaseGenerator.config.settings import get_jira_config, get_llm_config
-    from TestCaseGenerator.generators.functional_test_generator import FunctionalTestGenerator
-    from TestCaseGenerator.integrations.llm_client import LLMClient
-    from TestCaseGenerator.formatters.gherkin_formatter import GherkinFormatter
-    from TestCaseGenerator.models.input_models import TestCaseRequest, AcceptanceCriteria, TestSpecification
+    from integrations.jira_client import JiraClient
+    from config.settings import JiraConfig, get_jira_config, get_llm_config
+    from generators.functional_test_generator import FunctionalTestGenerator
+    from integrations.llm_client import LLMClient
+    from formatters.gherkin_formatter import GherkinFormatter
+    from models.input_models import TestCaseRequest, AcceptanceCriteria, TestSpecification
 except ImportError as e:
-    print(f"Import error: {e}")
-    print("Some modules may be missing. Trying alternative approach...")
+    logger.error("Import error: %s", e)
+    logger.error("Some modules may be missing. Trying alternative approach...")
     sys.exit(1)
 
+# Criteria already phrased as Gherkin steps (case-insensitive, leading whitespace allowed)
+_GWT_RE = re.compile(r'^\s*(?:given|when|then)\b', re.IGNORECASE)
+
+# Criteria used when a ticket has none of its own
+_FALLBACK_CRITERIA = (
+    "Given a user accesses the system",
+    "When they perform the required action",
+    "Then the system responds appropriately"
+)
+
+# Template test specification; each request gets its own deep copy
+_DEFAULT_SPEC = TestSpecification(
+    test_types=["functional"],
+    test_level="integration",
+    output_format="gherkin",
+    priority="high"
+)
+
+# Upper bound on tickets fetched and generated at the same time
+MAX_CONCURRENT_TICKETS = 8
+
+
+def _paragraph_text(paragraph, prefix=""):
+    parts = [prefix]
+    append_part = parts.append
+    for c in paragraph.get("content", ()):
+        if c.get("type") == "text":
+            append_part(c.get("text", ""))
+    return "".join(parts)
+
+
+def _handle_paragraph(block, lines):
+    lines.append(_paragraph_text(block))
+
+
+def _handle_list(block, lines):
+    append_line = lines.append
+    for li in block.get("content", ()):
+        for c in li.get("content", ()):
+            if c.get("type") == "paragraph":
+                append_line(_paragraph_text(c, "- "))
+
+
+# Jira rich-text block type -> handler appending its plain-text lines
+_BLOCK_HANDLERS = {
+    "paragraph": _handle_paragraph,
+    "orderedList": _handle_list,
+    "bulletList": _handle_list,
+}
+
+
 # Convert Jira rich-text (doc) to plain string
 def jira_doc_to_text(doc):
     if not doc:
         return ""
     if isinstance(doc, str):
         return doc
+    content = doc.get("content")
+    if not content:
+        return ""
     lines = []
-    for block in doc.get("content", []):
-        block_type = block.get("type")
-        if block_type == "paragraph":
-            paragraph_text = "".join(
-                c.get("text", "") for c in block.get("content", []) if c.get("type") == "text"
-            )
-            lines.append(paragraph_text)
-        elif block_type in ["orderedList", "bulletList"]:
-            for li in block.get("content", []):
-                for c in li.get("content", []):
-                    if c.get("type") == "paragraph":
-                        text = "".join(cc.get("text", "") for cc in c.get("content", []) if cc.get("type") == "text")
-                        lines.append(f"- {text}")
+    get_handler = _BLOCK_HANDLERS.get
+    for block in content:
+        handler = get_handler(block.get("type"))
+        if handler:
+            handler(block, lines)
     return "\n".join(lines)
 
 
-async def fetch_and_generate_tests():
-    print("🚀 Fetching Jira Stories and Generating Test Cases")
-    print("=" * 60)
-
-    # Check mode selection
-    mode = os.getenv("TESTCASE_MODE", "online").lower()
-    
-    # Check environment variables for online mode
-    jira_username = os.getenv("JIRA_USERNAME")
-    jira_token = os.getenv("JIRA_API_TOKEN")
-    jira_url = os.getenv("JIRA_BASE_URL")
-    
-    print("Checking Jira credentials...")
-    if not all([os.getenv('JIRA_USERNAME'), os.getenv('JIRA_API_TOKEN')]):
-        print("❌ Missing Jira credentials - please set JIRA_USERNAME and JIRA_API_TOKEN")
-        sys.exit(1)
-
-    print("✅ Found valid Jira credentials - proceeding with online mode")
-    
-    if mode == "local":
-        use_dummy = True
-    else:
-        print(f"✅ Found Jira credentials for: {jira_username}")
-        print(f"   Base URL: {jira_url}")
-        use_dummy = False
-        
-        # Verify connection works before proceeding
-        try:
-            import base64
-            # Test Jira connection
-            auth_str = f"{os.getenv('JIRA_USERNAME')}:{os.getenv('JIRA_API_TOKEN')}"
-            encoded_auth = base64.b64encode(auth_str.encode()).decode()
-            headers = {"Authorization": f"Basic {encoded_auth}", "Accept": "application/json"}
-            
-            async with httpx.AsyncClient(headers=headers) as session:
-                response = await session.get(f"{os.getenv('JIRA_BASE_URL')}/rest/api/2/myself")
-                response.raise_for_status()
-                print(f"✅ Successfully connected to Jira as {response.json()['displayName']}")
-        except Exception as e:
-            print(f"❌ Jira connection failed: {str(e)}")
-            sys.exit(1)
-
-    # Get configuration
-    try:
-        if not use_dummy:
-            jira_config = get_jira_config()
-            if not jira_config:
-                print("❌ Jira configuration not found, switching to dummy mode")
-                use_dummy = True
-        
-        if use_dummy:
-            # Create a minimal jira config for dummy mode
-            from config.settings import JiraConfig
-            jira_config = JiraConfig(
-                base_url="https://dummy.atlassian.net",
-                username="dummy@example.com", 
-                api_token="dummy_token"
-            )
-    except Exception as e:
-        print(f"❌ Configuration error: {e}")
+def _log_preview(formatted_output):
+    """Log the first 20 lines of generated test cases."""
+    if not logger.isEnabledFor(logging.INFO):
         return
+    logger.info("📄 Preview of generated test cases:")
+    logger.info("%s", "-" * 40)
+    preview_lines = formatted_output.splitlines()
+    logger.info("%s", "\n".join(preview_lines[:20]))
+    if len(preview_lines) > 20:
+        logger.info("... (truncated)")
 
-    # Initialize Jira client
-    try:
-        jira_client = JiraClient(jira_config)
-        print("✅ Jira client created")
-    except Exception as e:
-        print(f"❌ Failed to create Jira client: {e}")
-        return
 
-    # Get ticket IDs from environment variable or use default
-    tickets_to_fetch = os.getenv("JIRA_TICKET_IDS", "SJP-2").split(",")
-    
-    # For local mode, read from file
-    if mode == "local":
-        local_file = "dummy_user_story.txt"
-        if not os.path.exists(local_file):
-            with open(local_file, "w") as f:
-                f.write("As a user\nI want to perform an action\nSo that I can achieve a goal")
-            print(f"ℹ️ Created default {local_file} for local mode")
-    
-    for ticket_id in tickets_to_fetch:
-        print(f"\n📋 Fetching ticket: {ticket_id}")
-        print("-" * 40)
+async def process_ticket(ticket_id, jira_client, test_generator, formatter, sem, use_dummy, mode, local_file=None):
+    """Fetch one ticket and write its generated test cases to a .feature file."""
+    async with sem:
+        logger.info("📋 Fetching ticket: %s", ticket_id)
+        logger.info("%s", "-" * 40)
         try:
             # Fetch the ticket (dummy, local or real)
             if use_dummy:
                 if mode == "local":
-                    print(f"📝 Using local story from {local_file}")
+                    logger.info("📝 Using local story from %s", local_file)
                     with open(local_file, "r") as f:
                         local_content = f.read()
                     ticket = jira_client.generate_dummy_ticket(ticket_id)
@@ -146,105 +132,83 @@ async def fetch_and_generate_tests():
                         "Then test cases should be generated"
                     ]
                 else:
-                    print("📝 Using dummy ticket data...")
+                    logger.info("📝 Using dummy ticket data...")
                     ticket = jira_client.generate_dummy_ticket(ticket_id)
             else:
                 ticket = await jira_client.fetch_ticket(ticket_id)
 
             # Convert description to string if needed
-            if hasattr(ticket.issue, 'description'):
-                if isinstance(ticket.issue.description, dict):
-                    ticket.issue.description = jira_doc_to_text(ticket.issue.description)
-                elif ticket.issue.description is None:
-                    ticket.issue.description = ""
-
-            print(f"✅ Ticket fetched: {ticket.issue.summary}")
-            print(f"   Status: {ticket.issue.status['name']}")
-            
-            if hasattr(ticket.issue, 'assignee') and ticket.issue.assignee:
-                assignee_name = ticket.issue.assignee.display_name if hasattr(ticket.issue.assignee, 'display_name') else str(ticket.issue.assignee)
-                print(f"   Assignee: {assignee_name}")
+            issue = ticket.issue
+            description = getattr(issue, 'description', "")
+            if isinstance(description, dict):
+                issue.description = jira_doc_to_text(description)
+            elif description is None:
+                issue.description = ""
+
+            logger.info("✅ Ticket fetched: %s", issue.summary)
+            logger.info("   Status: %s", issue.status['name'])
+
+            assignee = getattr(issue, 'assignee', None)
+            if assignee:
+                logger.info("   Assignee: %s", getattr(assignee, 'display_name', None) or str(assignee))
             else:
-                print(f"   Assignee: Unassigned")
+                logger.info("   Assignee: Unassigned")
 
             # Acceptance Criteria
-            if hasattr(ticket, 'acceptance_criteria') and ticket.acceptance_criteria:
-                print(f"   Acceptance Criteria: {len(ticket.acceptance_criteria)} items")
-                for i, criteria in enumerate(ticket.acceptance_criteria[:3], 1):
-                    print(f"     {i}. {criteria}")
-                if len(ticket.acceptance_criteria) > 3:
-                    print(f"     ... and {len(ticket.acceptance_criteria) - 3} more")
+            acceptance_criteria = getattr(ticket, 'acceptance_criteria', None)
+            if acceptance_criteria:
+                logger.info("   Acceptance Criteria: %s items", len(acceptance_criteria))
+                for i, criteria in enumerate(acceptance_criteria[:3], 1):
+                    logger.info("     %s. %s", i, criteria)
+                if len(acceptance_criteria) > 3:
+                    logger.info("     ... and %s more", len(acceptance_criteria) - 3)
             else:
-                print(f"   Acceptance Criteria: None found")
+                logger.info("   Acceptance Criteria: None found")
 
             # Generate test cases
-            print(f"\n🧪 Generating test cases for {ticket_id}...")
+            logger.info("🧪 Generating test cases for %s...", ticket_id)
             try:
-                ollama_config = get_llm_config("ollama")
-                if not ollama_config:
-                    print("❌ Ollama configuration not found")
-                    continue
-                    
-                llm_client = LLMClient(ollama_config)
-                test_generator = FunctionalTestGenerator(llm_client)
-
                 # Get acceptance criteria
-                if hasattr(ticket, 'acceptance_criteria') and ticket.acceptance_criteria:
+                if acceptance_criteria:
                     # Ensure criteria is properly formatted for LLM processing
                     criteria_list = []
-                    for criteria in ticket.acceptance_criteria:
+                    append_criteria = criteria_list.append
+                    for criteria in acceptance_criteria:
                         if isinstance(criteria, dict):
                             criteria = jira_doc_to_text(criteria)
                         # Normalize criteria format for LLM
                         criteria = criteria.strip()
-                        if not criteria.lower().startswith(('given', 'when', 'then')):
+                        if not _GWT_RE.match(criteria):
                             criteria = f"Given {criteria}" if not criteria_list else f"Then {criteria}"
-                        criteria_list.append(criteria)
+                        append_criteria(criteria)
                 else:
                     # Fallback criteria
-                    criteria_list = [
-                        "Given a user accesses the system",
-                        "When they perform the required action", 
-                        "Then the system responds appropriately"
-                    ]
+                    criteria_list = _FALLBACK_CRITERIA
 
-                ac_type = ticket.get_acceptance_criteria_type() if hasattr(ticket, 'get_acceptance_criteria_type') else "gherkin"
+                get_ac_type = getattr(ticket, 'get_acceptance_criteria_type', None)
+                ac_type = get_ac_type() if get_ac_type else "gherkin"
                 ac = AcceptanceCriteria(criteria_type=ac_type, criteria_list=criteria_list)
 
-                spec = TestSpecification(
-                    test_types=["functional"],
-                    test_level="integration",
-                    output_format="gherkin",
-                    priority="high"
-                )
-
                 request = TestCaseRequest(
                     acceptance_criteria=ac,
-                    test_specification=spec,
+                    test_specification=_DEFAULT_SPEC.model_copy(deep=True),
                     jira_ticket_id=ticket_id
                 )
 
                 test_cases = await test_generator.generate(request)
-                print(f"✅ Generated {len(test_cases)} test cases")
+                logger.info("✅ Generated %s test cases", len(test_cases))
 
-                formatter = GherkinFormatter()
                 formatted_output = formatter.format_test_cases(test_cases, request)
 
                 filename = f"test_cases_{ticket_id}.feature"
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(formatted_output)
+                Path(filename).write_text(formatted_output, encoding="utf-8")
 
-                print(f"💾 Test cases saved to: {filename}")
-                print(f"\n📄 Preview of generated test cases:")
-                print("-" * 40)
-                for line in formatted_output.split("\n")[:20]:
-                    print(line)
-                if len(formatted_output.split("\n")) > 20:
-                    print("... (truncated)")
+                logger.info("💾 Test cases saved to: %s", filename)
+                _log_preview(formatted_output)
 
             except Exception as e:
-                print(f"❌ Error generating test cases: {e}")
-                print("🔄 Using fallback test case generation...")
+                logger.error("❌ Error generating test cases: %s", e)
+                logger.info("🔄 Using fallback test case generation...")
                 # Generate basic test cases from acceptance criteria
                 test_cases = []
                 for criteria in criteria_list:
@@ -256,37 +220,136 @@ async def fetch_and_generate_tests():
                         })
                 if not test_cases:
                     test_cases = [{"name": "Basic test case", "steps": criteria_list}]
-                
-                formatter = GherkinFormatter()
+
                 formatted_output = formatter.format_test_cases(test_cases, request)
-                
+
                 filename = f"test_cases_{ticket_id}.feature"
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(formatted_output)
-                
-                print(f"💾 Basic test cases saved to: {filename}")
-                print(f"\n📄 Preview of generated test cases:")
-                print("-" * 40)
-                for line in formatted_output.split("\n")[:20]:
-                    print(line)
-                if len(formatted_output.split("\n")) > 20:
-                    print("... (truncated)")
+                Path(filename).write_text(formatted_output, encoding="utf-8")
+
+                logger.info("💾 Basic test cases saved to: %s", filename)
+                _log_preview(formatted_output)
+
+        except Exception as e:
+            logger.exception("❌ Error processing %s: %s", ticket_id, e)
+
+
+async def fetch_and_generate_tests():
+    logger.info("🚀 Fetching Jira Stories and Generating Test Cases")
+    logger.info("%s", "=" * 60)
+
+    # Check mode selection
+    mode = os.getenv("TESTCASE_MODE", "online").lower()
+
+    # Check environment variables for online mode
+    jira_username = os.getenv("JIRA_USERNAME")
+    jira_token = os.getenv("JIRA_API_TOKEN")
+    jira_url = os.getenv("JIRA_BASE_URL")
+
+    logger.info("Checking Jira credentials...")
+    if not (jira_username and jira_token):
+        logger.error("❌ Missing Jira credentials - please set JIRA_USERNAME and JIRA_API_TOKEN")
+        sys.exit(1)
+
+    logger.info("✅ Found valid Jira credentials - proceeding with online mode")
+
+    use_dummy = mode == "local"
+    if not use_dummy:
+        logger.info("✅ Found Jira credentials for: %s", jira_username)
+        logger.info("   Base URL: %s", jira_url)
+
+    # Get configuration
+    try:
+        if not use_dummy:
+            jira_config = get_jira_config()
+            if not jira_config:
+                logger.error("❌ Jira configuration not found, switching to dummy mode")
+                use_dummy = True
+
+        if use_dummy:
+            # Create a minimal jira config for dummy mode
+            jira_config = JiraConfig(
+                base_url="https://dummy.atlassian.net",
+                username="dummy@example.com", 
+                api_token="dummy_token"
+            )
+    except Exception as e:
+        logger.error("❌ Configuration error: %s", e)
+        return
 
+    # Initialize Jira client; its connection pool, built from jira_config,
+    # also serves the credential check below
+    try:
+        jira_client = JiraClient(jira_config)
+        logger.info("✅ Jira client created")
+    except Exception as e:
+        logger.error("❌ Failed to create Jira client: %s", e)
+        return
+
+    if not use_dummy:
+        # Verify connection works before proceeding
+        try:
+            response = await jira_client.client.get("/rest/api/2/myself")
+            response.raise_for_status()
+            logger.info("✅ Successfully connected to Jira as %s", _json_loads(response.content)['displayName'])
         except Exception as e:
-            print(f"❌ Error processing {ticket_id}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
+            logger.error("❌ Jira connection failed: %s", e)
+            await jira_client.close()
+            sys.exit(1)
 
     try:
-        await jira_client.close()
-    except:
-        pass
-        
-    print("\n✅ Process completed!")
+        # Get ticket IDs from environment variable or use default
+        tickets_to_fetch = os.getenv("JIRA_TICKET_IDS", "SJP-2").split(",")
+
+        # For local mode, read from file
+        local_file = None
+        if mode == "local":
+            local_file = "dummy_user_story.txt"
+            if not os.path.exists(local_file):
+                with open(local_file, "w") as f:
+                    f.write("As a user\nI want to perform an action\nSo that I can achieve a goal")
+                logger.info("ℹ️ Created default %s for local mode", local_file)
+
+        # Build the LLM pipeline once so every ticket reuses the same Ollama connection pool
+        ollama_config = get_llm_config("ollama")
+        if not ollama_config:
+            logger.error("❌ Ollama configuration not found")
+            return
+        llm_client = LLMClient(ollama_config)
+        test_generator = FunctionalTestGenerator(llm_client)
+        formatter = GherkinFormatter()
+
+        # Process all tickets concurrently; the semaphore bounds in-flight Jira/LLM calls
+        sem = asyncio.Semaphore(MAX_CONCURRENT_TICKETS)
+        await asyncio.gather(
+            *(process_ticket(ticket_id, jira_client, test_generator, formatter, sem, use_dummy, mode, local_file)
+              for ticket_id in tickets_to_fetch),
+            return_exceptions=True
+        )
+
+        try:
+            await llm_client.close()
+        except Exception as e:
+            logger.warning("⚠️ Failed to close LLM client: %s", e)
+    finally:
+        try:
+            await jira_client.close()
+        except Exception as e:
+            logger.warning("⚠️ Failed to close Jira client: %s", e)
+
+    logger.info("✅ Process completed!")
+
+
+def main():
+    """Console-script entry point (``fetch-jira-tickets``).
+
+    ``.env``, ``dummy_user_story.txt`` and the ``.feature`` outputs are all
+    resolved against the caller's working directory.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(fetch_and_generate_tests())
 
 
 if __name__ == "__main__":
-    # Ensure we're in the right directory
+    # Run as a script, keep working from the script's own directory
     os.chdir(Path(__file__).parent)
-    asyncio.run(fetch_and_generate_tests())
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,11 +1,30 @@
 """Output formatters for different test case formats."""
 
-from .gherkin_formatter import GherkinFormatter
-from .code_skeleton_formatter import CodeSkeletonFormatter
-from .human_readable_formatter import HumanReadableFormatter
+import importlib
+
+# Formatter submodules are imported on first access so that callers only pay
+# for the formatter they actually use.
+_LAZY_IMPORTS = {
+    "GherkinFormatter": ".gherkin_formatter",
+    "CodeSkeletonFormatter": ".code_skeleton_formatter",
+    "HumanReadableFormatter": ".human_readable_formatter",
+}
 
 __all__ = [
     "GherkinFormatter",
     "CodeSkeletonFormatter",
     "HumanReadableFormatter"
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,7 +1,12 @@
 """Code skeleton formatter for generating test code templates in various frameworks."""
 
+import io
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import string
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, BinaryIO, Callable, Iterable, Optional, Tuple
 
 from models.test_models import TestCase, TestStep
 from models.input_models import TestCaseRequest
@@ -9,19 +14,348 @@ from models.input_models import TestCaseRequest
 
 logger = logging.getLogger(__name__)
 
+_NL = "\n"
+
+# (description, test_id, priority, joined tags) shown in each test method header
+_Header = Tuple[str, str, str, str]
+
+# Formatted test methods kept per formatter before the least recently used is evicted
+_CASE_CACHE_MAXSIZE = 1024
+
+# Compiled template: (literal, field name or None) pairs
+_CompiledTemplate = Tuple[Tuple[str, Optional[str]], ...]
+
+# Characters stripped from titles when building method names. ASCII titles
+# go through the translation table; the regex handles everything else.
+_METHOD_NAME_RE = re.compile(r'[^a-zA-Z0-9\s]')
+_METHOD_NAME_TRANS = {
+    ord(char): None
+    for char in map(chr, range(128))
+    if _METHOD_NAME_RE.match(char)
+}
+
+# (metadata key, header label, value formatter) in output order
+_METADATA_SPEC = (
+    ("jira_ticket", "JIRA Ticket", format),
+    ("test_level", "Test Level", format),
+    ("priority", "Priority", format),
+    ("tags", "Tags", ", ".join),
+    ("generated_at", "Generated", format),
+    ("requirements", "Requirements", ", ".join)
+)
+
+# Comment marker used for step annotations in each framework
+_COMMENT_PREFIX = {
+    "playwright": "#",
+    "pytest": "#",
+    "cypress": "//",
+    "selenium": "#",
+    "junit": "//"
+}
+
+# Step action keywords in match priority order
+_KEYWORD_ORDER = ("click", "enter", "input", "select", "navigate", "go to", "submit", "verify", "check")
+
+# Code emitted for a step per framework and action keyword; keywords missing
+# from a framework's table fall through to the next one in _KEYWORD_ORDER
+_STEP_TABLE = {
+    "playwright": {
+        "click": "page.click('selector')  # TODO: Update selector",
+        "enter": "page.fill('selector', 'value')  # TODO: Update selector and value",
+        "input": "page.fill('selector', 'value')  # TODO: Update selector and value",
+        "select": "page.select_option('selector', 'value')  # TODO: Update selector and value",
+        "navigate": "page.goto('url')  # TODO: Update URL",
+        "go to": "page.goto('url')  # TODO: Update URL",
+        "submit": "page.click('button[type=\"submit\"]')  # TODO: Update selector",
+        "verify": "expect(page.locator('selector')).to_be_visible()  # TODO: Update selector",
+        "check": "expect(page.locator('selector')).to_be_visible()  # TODO: Update selector"
+    },
+    "pytest": {
+        "click": "# TODO: Implement click action",
+        "enter": "# TODO: Implement input action",
+        "input": "# TODO: Implement input action",
+        "verify": "assert True  # TODO: Implement verification",
+        "check": "assert True  # TODO: Implement verification"
+    },
+    "cypress": {
+        "click": "cy.get('selector').click()  // TODO: Update selector",
+        "enter": "cy.get('selector').type('value')  // TODO: Update selector and value",
+        "input": "cy.get('selector').type('value')  // TODO: Update selector and value",
+        "navigate": "cy.visit('url')  // TODO: Update URL",
+        "go to": "cy.visit('url')  // TODO: Update URL",
+        "verify": "cy.get('selector').should('be.visible')  // TODO: Update selector",
+        "check": "cy.get('selector').should('be.visible')  // TODO: Update selector"
+    },
+    "selenium": {
+        "click": "self.driver.find_element(By.CSS_SELECTOR, 'selector').click()  # TODO: Update selector",
+        "enter": "element = self.driver.find_element(By.CSS_SELECTOR, 'selector')\n        element.clear()\n        element.send_keys('value')  # TODO: Update selector and value",
+        "input": "element = self.driver.find_element(By.CSS_SELECTOR, 'selector')\n        element.clear()\n        element.send_keys('value')  # TODO: Update selector and value",
+        "navigate": "self.driver.get('url')  # TODO: Update URL",
+        "go to": "self.driver.get('url')  # TODO: Update URL",
+        "verify": "# TODO: Implement verification",
+        "check": "# TODO: Implement verification"
+    },
+    "junit": {
+        "click": "// TODO: Implement click action",
+        "enter": "// TODO: Implement input action",
+        "input": "// TODO: Implement input action",
+        "verify": "assertTrue(true);  // TODO: Implement verification",
+        "check": "assertTrue(true);  // TODO: Implement verification"
+    }
+}
+
+# All keywords are located in a single scan; the lookahead keeps overlapping
+# matches (e.g. "navigatenter") so priority is decided by _KEYWORD_ORDER
+# rather than by position in the action
+_STEP_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _KEYWORD_ORDER)) + "))")
+_KEYWORD_RANK = {keyword: rank for rank, keyword in enumerate(_KEYWORD_ORDER)}
+
+
+@lru_cache(maxsize=1024)
+def _keyword_ranks(action_lower: str) -> Tuple[int, ...]:
+    """Return the ranks of all step keywords found in an action, best first.
+    
+    Step actions repeat heavily across test cases and frameworks, so the scan
+    result is cached per distinct lowercased action.
+    """
+    return tuple(sorted({_KEYWORD_RANK[keyword] for keyword in _STEP_KEYWORD_RE.findall(action_lower)}))
+
+
+# Per-framework step code indexed by keyword rank, None where unsupported
+_STEP_CODE = {
+    framework: tuple(table.get(keyword) for keyword in _KEYWORD_ORDER)
+    for framework, table in _STEP_TABLE.items()
+}
+
+# Test class templates per framework
+_PLAYWRIGHT_TEMPLATE = """import pytest
+from playwright.sync_api import expect
+
+class {class_name}:
+    \"\"\"Test class for Playwright tests.\"\"\"
+    
+{setup_methods}
+    
+{test_methods}"""
+
+_PYTEST_TEMPLATE = """import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+class {class_name}:
+    \"\"\"Test class for Pytest tests.\"\"\"
+    
+{setup_methods}
+    
+{test_methods}"""
+
+_CYPRESS_TEMPLATE = """describe('{class_name}', () => {{
+    \"\"\"Test suite for Cypress tests.\"\"\"
+    
+{setup_methods}
+    
+{test_methods}
+}});"""
+
+_SELENIUM_TEMPLATE = """from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+class {class_name}:
+    \"\"\"Test class for Selenium tests.\"\"\"
+    
+{setup_methods}
+    
+{test_methods}"""
+
+_JUNIT_TEMPLATE = """import org.junit.Test;
+import org.junit.Before;
+import org.junit.After;
+import static org.junit.Assert.*;
+
+public class {class_name} {{
+    \"\"\"Test class for JUnit tests.\"\"\"
+    
+{setup_methods}
+    
+{test_methods}
+}}"""
+
+_FRAMEWORK_IMPORTS = {
+    "playwright": """from playwright.sync_api import expect
+import pytest""",
+    "pytest": """import pytest
+from selenium import webdriver
+from selenium.webdriver.common.by import By""",
+    "cypress": """// Cypress imports are handled automatically""",
+    "selenium": """from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC""",
+    "junit": """import org.junit.Test;
+import static org.junit.Assert.*;"""
+}
+
+_SETUP_METHODS = {
+    "playwright": """    def setup_method(self, method):
+        \"\"\"Setup method for each test.\"\"\"
+        # TODO: Add any setup logic needed before each test
+        pass
+    
+    def teardown_method(self, method):
+        \"\"\"Teardown method for each test.\"\"\"
+        # TODO: Add any cleanup logic needed after each test
+        pass""",
+    "pytest": """    def setup_method(self, method):
+        \"\"\"Setup method for each test.\"\"\"
+        # TODO: Initialize WebDriver or other test dependencies
+        pass
+    
+    def teardown_method(self, method):
+        \"\"\"Teardown method for each test.\"\"\"
+        # TODO: Clean up WebDriver or other test dependencies
+        pass""",
+    "cypress": """    beforeEach(() => {
+        // Setup before each test
+        // TODO: Add any setup logic
+    });
+    
+    afterEach(() => {
+        // Cleanup after each test
+        // TODO: Add any cleanup logic
+    });""",
+    "selenium": """    def setup_method(self, method):
+        \"\"\"Setup method for each test.\"\"\"
+        # TODO: Initialize WebDriver
+        # self.driver = webdriver.Chrome()
+        pass
+    
+    def teardown_method(self, method):
+        \"\"\"Teardown method for each test.\"\"\"
+        # TODO: Clean up WebDriver
+        # if hasattr(self, 'driver'):
+        #     self.driver.quit()
+        pass""",
+    "junit": """    @Before
+    public void setUp() {
+        // Setup before each test
+        // TODO: Add any setup logic
+    }
+    
+    @After
+    public void tearDown() {
+        // Cleanup after each test
+        // TODO: Add any cleanup logic
+    }"""
+}
+
+
+@lru_cache(maxsize=None)
+def _compile_template(template: str) -> _CompiledTemplate:
+    """Split a format template into (literal, field name) pairs.
+    
+    Templates are parsed on first use, so only the frameworks actually
+    requested pay for compilation.
+    """
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in string.Formatter().parse(template)
+    )
+
+
+@lru_cache(maxsize=None)
+def _encode_template(template: str) -> Tuple[Tuple[bytes, Optional[str]], ...]:
+    """Compile a template with its literals pre-encoded as UTF-8."""
+    return tuple(
+        (literal.encode("utf-8"), field_name)
+        for literal, field_name in _compile_template(template)
+    )
+
+
+def _build_emitter(name: str, template: str) -> Callable[..., str]:
+    """Generate a function that renders template from keyword arguments.
+    
+    The template is split into literals once and the generated function body
+    is a single join of those constants with the field arguments.
+    """
+    fields: List[str] = []
+    parts: List[str] = []
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        if literal:
+            parts.append(repr(literal))
+        if field_name is not None:
+            if field_name not in fields:
+                fields.append(field_name)
+            parts.append(field_name)
+    source = f"def {name}(*, {', '.join(fields)}):\n    return ''.join(({', '.join(parts)},))\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+# Test method templates for the frameworks rendered through generated emitters
+_CYPRESS_TEST_TEMPLATE = """    it('{title}', () => {{
+        // {description}
+        // Test ID: {test_id}
+        // Priority: {priority}
+        // Tags: {tags}
+        
+        // Test steps
+{steps}
+        
+        // Additional verifications
+        // TODO: Add specific assertions based on requirements
+    }});"""
+
+_JUNIT_TEST_TEMPLATE = """    @Test
+    public void test{method_name}() {{
+        // {description}
+        // Test ID: {test_id}
+        // Priority: {priority}
+        // Tags: {tags}
+        
+        // Test steps
+{steps}
+        
+        // Assertions
+        // TODO: Add specific assertions based on requirements
+    }}"""
+
+_emit_cypress_test = _build_emitter("_emit_cypress_test", _CYPRESS_TEST_TEMPLATE)
+_emit_junit_test = _build_emitter("_emit_junit_test", _JUNIT_TEST_TEMPLATE)
+
+
+# File templates per framework; module level so mypyc can evaluate the
+# derived tuple of framework names
+_FRAMEWORK_TEMPLATES = {
+    "playwright": _PLAYWRIGHT_TEMPLATE,
+    "pytest": _PYTEST_TEMPLATE,
+    "cypress": _CYPRESS_TEMPLATE,
+    "selenium": _SELENIUM_TEMPLATE,
+    "junit": _JUNIT_TEMPLATE
+}
+
+_SUPPORTED_FRAMEWORKS = tuple(_FRAMEWORK_TEMPLATES)
+
 
 class CodeSkeletonFormatter:
     """Formatter for generating test code skeletons in various frameworks."""
     
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize the code skeleton formatter."""
-        self.framework_templates = {
-            "playwright": self._get_playwright_template(),
-            "pytest": self._get_pytest_template(),
-            "cypress": self._get_cypress_template(),
-            "selenium": self._get_selenium_template(),
-            "junit": self._get_junit_template()
+        # Per-framework test method formatters
+        self._formatters = {
+            "playwright": self._format_playwright_test,
+            "pytest": self._format_pytest_test,
+            "cypress": self._format_cypress_test,
+            "selenium": self._format_selenium_test,
+            "junit": self._format_junit_test
         }
+        
+        # Formatted test methods keyed on the test case content and framework,
+        # least recently used first
+        self._case_cache: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
     
     def format_test_cases(self, test_cases: List[TestCase], request: TestCaseRequest, 
                          framework: str = "playwright") -> str:
@@ -30,66 +364,145 @@ class CodeSkeletonFormatter:
         if not test_cases:
             return f"# No test cases to format for {framework}"
         
-        if framework not in self.framework_templates:
+        # Validate the framework once; the resolved formatter is passed down
+        formatter = self._formatters.get(framework)
+        if formatter is None:
             return f"# Unsupported framework: {framework}"
         
         try:
-            template = self.framework_templates[framework]
-            
-            # Generate code for each test case
-            test_methods = []
-            for test_case in test_cases:
-                method_code = self._format_test_case(test_case, framework)
-                if method_code:
-                    test_methods.append(method_code)
+            compiled = _compile_template(_FRAMEWORK_TEMPLATES[framework])
             
-            # Combine into complete test file
-            complete_code = template.format(
+            # Stream the complete test file into a single buffer
+            buf = io.StringIO()
+            self._write_template(
+                buf.write,
+                compiled,
+                self._iter_test_methods(test_cases, framework, formatter),
+                "\n\n",
                 class_name=self._generate_class_name(request, framework),
-                test_methods="\n\n".join(test_methods),
-                imports=self._get_framework_imports(framework),
-                setup_methods=self._get_setup_methods(framework)
+                imports=_FRAMEWORK_IMPORTS.get(framework, ""),
+                setup_methods=_SETUP_METHODS.get(framework, "")
             )
             
-            return complete_code
+            return buf.getvalue()
             
         except Exception as e:
             logger.error(f"Error formatting test cases to {framework}: {e}")
             return f"# Error formatting test cases: {e}"
     
-    def _format_test_case(self, test_case: TestCase, framework: str) -> Optional[str]:
-        """Format a single test case into code for the specified framework."""
+    def format_test_cases_to_stream(self, test_cases: List[TestCase], request: TestCaseRequest,
+                                    fileobj: BinaryIO, framework: str = "playwright") -> None:
+        """Write the code skeleton for test cases to a binary file as UTF-8.
+        
+        Produces the same bytes as encoding format_test_cases() output, but
+        writes pre-encoded template fragments directly instead of building the
+        whole file as one string first. On an error the message is written
+        after whatever output was already streamed.
+        """
+        
+        if not test_cases:
+            fileobj.write(f"# No test cases to format for {framework}".encode("utf-8"))
+            return
+        
+        formatter = self._formatters.get(framework)
+        if formatter is None:
+            fileobj.write(f"# Unsupported framework: {framework}".encode("utf-8"))
+            return
         
         try:
-            if framework == "playwright":
-                return self._format_playwright_test(test_case)
-            elif framework == "pytest":
-                return self._format_pytest_test(test_case)
-            elif framework == "cypress":
-                return self._format_cypress_test(test_case)
-            elif framework == "selenium":
-                return self._format_selenium_test(test_case)
-            elif framework == "junit":
-                return self._format_junit_test(test_case)
-            else:
+            compiled = _encode_template(_FRAMEWORK_TEMPLATES[framework])
+            
+            self._write_template(
+                fileobj.write,
+                compiled,
+                (
+                    method_code.encode("utf-8")
+                    for method_code in self._iter_test_methods(test_cases, framework, formatter)
+                ),
+                b"\n\n",
+                class_name=self._generate_class_name(request, framework).encode("utf-8"),
+                imports=_FRAMEWORK_IMPORTS.get(framework, "").encode("utf-8"),
+                setup_methods=_SETUP_METHODS.get(framework, "").encode("utf-8")
+            )
+            
+        except Exception as e:
+            logger.error(f"Error formatting test cases to {framework}: {e}")
+            fileobj.write(f"# Error formatting test cases: {e}".encode("utf-8"))
+    
+    def _iter_test_methods(self, test_cases: List[TestCase], framework: str,
+                           formatter: Callable[[TestCase, _Header], str]) -> Iterable[str]:
+        """Yield the formatted method code of each test case, skipping failures."""
+        
+        for test_case in test_cases:
+            method_code = self._format_test_case(test_case, framework, formatter=formatter)
+            if method_code:
+                yield method_code
+    
+    def _format_test_case(self, test_case: TestCase, framework: str,
+                          header: Optional[_Header] = None,
+                          formatter: Optional[Callable[[TestCase, _Header], str]] = None) -> Optional[str]:
+        """Format a single test case into code for the specified framework."""
+        
+        key = self._case_cache_key(test_case, framework)
+        cached = self._case_cache.get(key)
+        if cached is not None:
+            self._case_cache.move_to_end(key)
+            return cached
+        
+        if formatter is None:
+            formatter = self._formatters.get(framework)
+            if formatter is None:
                 return None
-                
+        
+        if header is None:
+            header = self._build_header(test_case)
+        
+        try:
+            method_code = formatter(test_case, header)
         except Exception as e:
+            # Failures are not cached so the next call retries the test case
             logger.warning(f"Failed to format test case {test_case.test_id} for {framework}: {e}")
             return None
+        
+        self._case_cache[key] = method_code
+        if len(self._case_cache) > _CASE_CACHE_MAXSIZE:
+            self._case_cache.popitem(last=False)
+        return method_code
+    
+    def _case_cache_key(self, test_case: TestCase, framework: str) -> Tuple[Any, ...]:
+        """Build the memoization key for a formatted test case."""
+        
+        return (
+            test_case.test_id,
+            framework,
+            test_case.title,
+            test_case.description,
+            test_case.priority.value,
+            tuple(test_case.tags),
+            tuple((step.action, step.expected_result) for step in test_case.steps)
+        )
+    
+    @staticmethod
+    def _build_header(test_case: TestCase) -> _Header:
+        """Collect the description, ID, priority and joined tags shown in each test method header."""
+        
+        return (test_case.description, test_case.test_id, test_case.priority.value, ", ".join(test_case.tags))
+    
+    def clear_cache(self) -> None:
+        """Drop all memoized test method output."""
+        
+        self._case_cache.clear()
     
-    def _format_playwright_test(self, test_case: TestCase) -> str:
+    def _format_playwright_test(self, test_case: TestCase, header: _Header) -> str:
         """Format test case for Playwright."""
         
+        description, test_id, priority, tags = header
+        
         # Generate test method name
         method_name = self._generate_method_name(test_case.title)
         
         # Generate test steps
-        steps_code = []
-        for step in test_case.steps:
-            step_code = self._format_playwright_step(step)
-            if step_code:
-                steps_code.append(step_code)
+        steps_code = self._format_steps(test_case.steps, "playwright")
         
         # Add assertions
         if test_case.steps:
@@ -101,40 +514,46 @@ class CodeSkeletonFormatter:
         
         test_code = f"""    def test_{method_name}(self, page):
         \"\"\"
-        {test_case.description}
+        {description}
         
-        Test ID: {test_case.test_id}
-        Priority: {test_case.priority.value}
-        Tags: {', '.join(test_case.tags)}
+        Test ID: {test_id}
+        Priority: {priority}
+        Tags: {tags}
         \"\"\"
         
         # Test steps
-{chr(10).join(steps_code)}
+{_NL.join(steps_code)}
         
         # Additional verifications
         # TODO: Add specific assertions based on requirements"""
         
         return test_code
     
-    def _format_playwright_step(self, step: TestStep) -> str:
-        """Format a test step for Playwright."""
-        
-        action_lower = step.action.lower()
-        
-        if "click" in action_lower:
-            return f"        # {step.action}\n        page.click('selector')  # TODO: Update selector"
-        elif "enter" in action_lower or "input" in action_lower:
-            return f"        # {step.action}\n        page.fill('selector', 'value')  # TODO: Update selector and value"
-        elif "select" in action_lower:
-            return f"        # {step.action}\n        page.select_option('selector', 'value')  # TODO: Update selector and value"
-        elif "navigate" in action_lower or "go to" in action_lower:
-            return f"        # {step.action}\n        page.goto('url')  # TODO: Update URL"
-        elif "submit" in action_lower:
-            return f"        # {step.action}\n        page.click('button[type=\"submit\"]')  # TODO: Update selector"
-        elif "verify" in action_lower or "check" in action_lower:
-            return f"        # {step.action}\n        expect(page.locator('selector')).to_be_visible()  # TODO: Update selector"
-        else:
-            return f"        # {step.action}\n        # TODO: Implement step: {step.action}"
+    def _format_steps(self, steps: List[TestStep], framework: str) -> List[str]:
+        """Format test steps using the framework's keyword dispatch table.
+        
+        All steps are handled in a single loop with the lookup tables bound to
+        locals; keyword ranks come from the per-action cache.
+        """
+        
+        comment = _COMMENT_PREFIX[framework]
+        codes = _STEP_CODE[framework]
+        keyword_ranks = _keyword_ranks
+        
+        steps_code: List[str] = []
+        for step in steps:
+            action = step.action
+            best: Optional[int] = None
+            for rank in keyword_ranks(action.lower()):
+                if codes[rank] is not None:
+                    best = rank
+                    break
+            if best is None:
+                steps_code.append(f"        {comment} {action}\n        {comment} TODO: Implement step: {action}")
+            else:
+                steps_code.append(f"        {comment} {action}\n        {codes[best]}")
+        
+        return steps_code
     
     def _generate_playwright_assertion(self, expected_result: str) -> str:
         """Generate Playwright assertion based on expected result."""
@@ -150,189 +569,103 @@ class CodeSkeletonFormatter:
         elif "enabled" in expected_lower:
             return "        expect(page.locator('selector')).to_be_enabled()  # TODO: Update selector"
         else:
-            return "        # TODO: Add assertion for: " + expected_result
+            return f"        # TODO: Add assertion for: {expected_result}"
     
-    def _format_pytest_test(self, test_case: TestCase) -> str:
+    def _format_pytest_test(self, test_case: TestCase, header: _Header) -> str:
         """Format test case for Pytest."""
         
+        description, test_id, priority, tags = header
         method_name = self._generate_method_name(test_case.title)
         
         # Generate test steps
-        steps_code = []
-        for step in test_case.steps:
-            step_code = self._format_pytest_step(step)
-            if step_code:
-                steps_code.append(step_code)
+        steps_code = self._format_steps(test_case.steps, "pytest")
         
         test_code = f"""    def test_{method_name}(self):
         \"\"\"
-        {test_case.description}
+        {description}
         
-        Test ID: {test_case.test_id}
-        Priority: {test_case.priority.value}
-        Tags: {', '.join(test_case.tags)}
+        Test ID: {test_id}
+        Priority: {priority}
+        Tags: {tags}
         \"\"\"
         
         # Test steps
-{chr(10).join(steps_code)}
+{_NL.join(steps_code)}
         
         # Assertions
         # TODO: Add specific assertions based on requirements"""
         
         return test_code
     
-    def _format_pytest_step(self, step: TestStep) -> str:
-        """Format a test step for Pytest."""
-        
-        action_lower = step.action.lower()
-        
-        if "click" in action_lower:
-            return f"        # {step.action}\n        # TODO: Implement click action"
-        elif "enter" in action_lower or "input" in action_lower:
-            return f"        # {step.action}\n        # TODO: Implement input action"
-        elif "verify" in action_lower or "check" in action_lower:
-            return f"        # {step.action}\n        assert True  # TODO: Implement verification"
-        else:
-            return f"        # {step.action}\n        # TODO: Implement step: {step.action}"
-    
-    def _format_cypress_test(self, test_case: TestCase) -> str:
+    def _format_cypress_test(self, test_case: TestCase, header: _Header) -> str:
         """Format test case for Cypress."""
         
-        method_name = self._generate_method_name(test_case.title)
+        description, test_id, priority, tags = header
         
         # Generate test steps
-        steps_code = []
-        for step in test_case.steps:
-            step_code = self._format_cypress_step(step)
-            if step_code:
-                steps_code.append(step_code)
-        
-        test_code = f"""    it('{test_case.title}', () => {{
-        // {test_case.description}
-        // Test ID: {test_case.test_id}
-        // Priority: {test_case.priority.value}
-        // Tags: {', '.join(test_case.tags)}
-        
-        // Test steps
-{chr(10).join(steps_code)}
-        
-        // Additional verifications
-        // TODO: Add specific assertions based on requirements
-    }});"""
-        
-        return test_code
-    
-    def _format_cypress_step(self, step: TestStep) -> str:
-        """Format a test step for Cypress."""
-        
-        action_lower = step.action.lower()
-        
-        if "click" in action_lower:
-            return f"        // {step.action}\n        cy.get('selector').click()  // TODO: Update selector"
-        elif "enter" in action_lower or "input" in action_lower:
-            return f"        // {step.action}\n        cy.get('selector').type('value')  // TODO: Update selector and value"
-        elif "navigate" in action_lower or "go to" in action_lower:
-            return f"        // {step.action}\n        cy.visit('url')  // TODO: Update URL"
-        elif "verify" in action_lower or "check" in action_lower:
-            return f"        // {step.action}\n        cy.get('selector').should('be.visible')  // TODO: Update selector"
-        else:
-            return f"        // {step.action}\n        // TODO: Implement step: {step.action}"
-    
-    def _format_selenium_test(self, test_case: TestCase) -> str:
+        steps_code = self._format_steps(test_case.steps, "cypress")
+        
+        return _emit_cypress_test(
+            title=test_case.title,
+            description=description,
+            test_id=test_id,
+            priority=priority,
+            tags=tags,
+            steps=_NL.join(steps_code)
+        )
+    
+    def _format_selenium_test(self, test_case: TestCase, header: _Header) -> str:
         """Format test case for Selenium."""
         
+        description, test_id, priority, tags = header
         method_name = self._generate_method_name(test_case.title)
         
         # Generate test steps
-        steps_code = []
-        for step in test_case.steps:
-            step_code = self._format_selenium_step(step)
-            if step_code:
-                steps_code.append(step_code)
+        steps_code = self._format_steps(test_case.steps, "selenium")
         
         test_code = f"""    def test_{method_name}(self):
         \"\"\"
-        {test_case.description}
+        {description}
         
-        Test ID: {test_case.test_id}
-        Priority: {test_case.priority.value}
-        Tags: {', '.join(test_case.tags)}
+        Test ID: {test_id}
+        Priority: {priority}
+        Tags: {tags}
         \"\"\"
         
         # Test steps
-{chr(10).join(steps_code)}
+{_NL.join(steps_code)}
         
         # Assertions
         # TODO: Add specific assertions based on requirements"""
         
         return test_code
     
-    def _format_selenium_step(self, step: TestStep) -> str:
-        """Format a test step for Selenium."""
-        
-        action_lower = step.action.lower()
-        
-        if "click" in action_lower:
-            return f"        # {step.action}\n        self.driver.find_element(By.CSS_SELECTOR, 'selector').click()  # TODO: Update selector"
-        elif "enter" in action_lower or "input" in action_lower:
-            return f"        # {step.action}\n        element = self.driver.find_element(By.CSS_SELECTOR, 'selector')\n        element.clear()\n        element.send_keys('value')  # TODO: Update selector and value"
-        elif "navigate" in action_lower or "go to" in action_lower:
-            return f"        # {step.action}\n        self.driver.get('url')  # TODO: Update URL"
-        elif "verify" in action_lower or "check" in action_lower:
-            return f"        # {step.action}\n        # TODO: Implement verification"
-        else:
-            return f"        # {step.action}\n        # TODO: Implement step: {step.action}"
-    
-    def _format_junit_test(self, test_case: TestCase) -> str:
+    def _format_junit_test(self, test_case: TestCase, header: _Header) -> str:
         """Format test case for JUnit."""
         
+        description, test_id, priority, tags = header
         method_name = self._generate_method_name(test_case.title)
         
         # Generate test steps
-        steps_code = []
-        for step in test_case.steps:
-            step_code = self._format_junit_step(step)
-            if step_code:
-                steps_code.append(step_code)
-        
-        test_code = f"""    @Test
-    public void test{method_name}() {{
-        // {test_case.description}
-        // Test ID: {test_case.test_id}
-        // Priority: {test_case.priority.value}
-        // Tags: {', '.join(test_case.tags)}
-        
-        // Test steps
-{chr(10).join(steps_code)}
-        
-        // Assertions
-        // TODO: Add specific assertions based on requirements
-    }}"""
-        
-        return test_code
-    
-    def _format_junit_step(self, step: TestStep) -> str:
-        """Format a test step for JUnit."""
-        
-        action_lower = step.action.lower()
+        steps_code = self._format_steps(test_case.steps, "junit")
         
-        if "click" in action_lower:
-            return f"        // {step.action}\n        // TODO: Implement click action"
-        elif "enter" in action_lower or "input" in action_lower:
-            return f"        // {step.action}\n        // TODO: Implement input action"
-        elif "verify" in action_lower or "check" in action_lower:
-            return f"        // {step.action}\n        assertTrue(true);  // TODO: Implement verification"
-        else:
-            return f"        // {step.action}\n        // TODO: Implement step: {step.action}"
+        return _emit_junit_test(
+            method_name=method_name,
+            description=description,
+            test_id=test_id,
+            priority=priority,
+            tags=tags,
+            steps=_NL.join(steps_code)
+        )
     
     def _generate_method_name(self, title: str) -> str:
         """Generate a valid method name from test case title."""
         
         # Remove special characters and convert to camelCase
-        import re
-        
-        # Clean the title
-        clean_title = re.sub(r'[^a-zA-Z0-9\s]', '', title)
+        if title.isascii():
+            clean_title = title.translate(_METHOD_NAME_TRANS)
+        else:
+            clean_title = _METHOD_NAME_RE.sub('', title)
         
         # Split into words and capitalize
         words = clean_title.split()
@@ -346,7 +679,7 @@ class CodeSkeletonFormatter:
         
         # Ensure it starts with a letter
         if not method_name[0].isalpha():
-            method_name = "test" + method_name
+            method_name = f"test{method_name}"
         
         return method_name
     
@@ -373,154 +706,30 @@ class CodeSkeletonFormatter:
         
         return f"{class_name}{framework_suffix}"
     
-    def _get_framework_imports(self, framework: str) -> str:
-        """Get framework-specific imports."""
-        
-        imports = {
-            "playwright": """from playwright.sync_api import expect
-import pytest""",
-            "pytest": """import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By""",
-            "cypress": """// Cypress imports are handled automatically""",
-            "selenium": """from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC""",
-            "junit": """import org.junit.Test;
-import static org.junit.Assert.*;"""
-        }
-        
-        return imports.get(framework, "")
-    
-    def _get_setup_methods(self, framework: str) -> str:
-        """Get framework-specific setup methods."""
-        
-        setup_methods = {
-            "playwright": """    def setup_method(self, method):
-        \"\"\"Setup method for each test.\"\"\"
-        # TODO: Add any setup logic needed before each test
-        pass
-    
-    def teardown_method(self, method):
-        \"\"\"Teardown method for each test.\"\"\"
-        # TODO: Add any cleanup logic needed after each test
-        pass""",
-            "pytest": """    def setup_method(self, method):
-        \"\"\"Setup method for each test.\"\"\"
-        # TODO: Initialize WebDriver or other test dependencies
-        pass
-    
-    def teardown_method(self, method):
-        \"\"\"Teardown method for each test.\"\"\"
-        # TODO: Clean up WebDriver or other test dependencies
-        pass""",
-            "cypress": """    beforeEach(() => {{
-        // Setup before each test
-        // TODO: Add any setup logic
-    }});
-    
-    afterEach(() => {{
-        // Cleanup after each test
-        // TODO: Add any cleanup logic
-    }});""",
-            "selenium": """    def setup_method(self, method):
-        \"\"\"Setup method for each test.\"\"\"
-        # TODO: Initialize WebDriver
-        # self.driver = webdriver.Chrome()
-        pass
-    
-    def teardown_method(self, method):
-        \"\"\"Teardown method for each test.\"\"\"
-        # TODO: Clean up WebDriver
-        # if hasattr(self, 'driver'):
-        #     self.driver.quit()
-        pass""",
-            "junit": """    @Before
-    public void setUp() {{
-        // Setup before each test
-        // TODO: Add any setup logic
-    }}
-    
-    @After
-    public void tearDown() {{
-        // Cleanup after each test
-        // TODO: Add any cleanup logic
-    }}"""
-        }
-        
-        return setup_methods.get(framework, "")
-    
-    def _get_playwright_template(self) -> str:
-        """Get Playwright test class template."""
-        return """import pytest
-from playwright.sync_api import expect
-
-class {class_name}:
-    \"\"\"Test class for Playwright tests.\"\"\"
-    
-{setup_methods}
-    
-{test_methods}"""
-    
-    def _get_pytest_template(self) -> str:
-        """Get Pytest test class template."""
-        return """import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-
-class {class_name}:
-    \"\"\"Test class for Pytest tests.\"\"\"
-    
-{setup_methods}
-    
-{test_methods}"""
-    
-    def _get_cypress_template(self) -> str:
-        """Get Cypress test template."""
-        return """describe('{class_name}', () => {{
-    \"\"\"Test suite for Cypress tests.\"\"\"
-    
-{setup_methods}
-    
-{test_methods}}
-);"""
-    
-    def _get_selenium_template(self) -> str:
-        """Get Selenium test class template."""
-        return """from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-class {class_name}:
-    \"\"\"Test class for Selenium tests.\"\"\"
-    
-{setup_methods}
-    
-{test_methods}"""
-    
-    def _get_junit_template(self) -> str:
-        """Get JUnit test class template."""
-        return """import org.junit.Test;
-import org.junit.Before;
-import org.junit.After;
-import static org.junit.Assert.*;
-
-public class {class_name} {{
-    \"\"\"Test class for JUnit tests.\"\"\"
-    
-{setup_methods}
-    
-{test_methods}
-}}"""
+    @staticmethod
+    def _write_template(write: Callable[[Any], Any], compiled: Tuple[Tuple[Any, Optional[str]], ...],
+                        test_methods: Iterable[Any], separator: Any, **values: Any) -> None:
+        """Write a compiled template through write, streaming test methods joined by separator.
+        
+        Works for str or bytes as long as the literals, values, methods and
+        separator all share the same type.
+        """
+        for literal, field_name in compiled:
+            write(literal)
+            if field_name == "test_methods":
+                for index, method_code in enumerate(test_methods):
+                    if index:
+                        write(separator)
+                    write(method_code)
+            elif field_name is not None:
+                write(values[field_name])
     
     def format_single_test_case(self, test_case: TestCase, framework: str = "playwright") -> str:
         """Format a single test case as standalone code."""
         
         try:
             # Create a minimal test class with just this test case
-            template = self.framework_templates.get(framework, self._get_playwright_template())
+            compiled = _compile_template(_FRAMEWORK_TEMPLATES.get(framework, _PLAYWRIGHT_TEMPLATE))
             
             # Format the test case
             test_method = self._format_test_case(test_case, framework)
@@ -530,46 +739,35 @@ public class {class_name} {{
             # Create minimal class
             class_name = f"Test{self._generate_method_name(test_case.title)}"
             
-            complete_code = template.format(
+            buf = io.StringIO()
+            self._write_template(
+                buf.write,
+                compiled,
+                (test_method,),
+                "\n\n",
                 class_name=class_name,
-                test_methods=test_method,
-                imports=self._get_framework_imports(framework),
-                setup_methods=self._get_setup_methods(framework)
+                imports=_FRAMEWORK_IMPORTS.get(framework, ""),
+                setup_methods=_SETUP_METHODS.get(framework, "")
             )
             
-            return complete_code
+            return buf.getvalue()
             
         except Exception as e:
             logger.error(f"Error formatting single test case: {e}")
             return f"# Error formatting test case: {e}"
     
-    def get_supported_frameworks(self) -> List[str]:
-        """Get list of supported frameworks."""
-        return list(self.framework_templates.keys())
+    def get_supported_frameworks(self) -> Tuple[str, ...]:
+        """Get the supported frameworks."""
+        return _SUPPORTED_FRAMEWORKS
     
     def add_code_metadata(self, content: str, metadata: Dict[str, Any]) -> str:
         """Add metadata comments to code content."""
         
-        metadata_comments = []
-        
-        # Add basic metadata
-        if "jira_ticket" in metadata:
-            metadata_comments.append(f"# JIRA Ticket: {metadata['jira_ticket']}")
-        
-        if "test_level" in metadata:
-            metadata_comments.append(f"# Test Level: {metadata['test_level']}")
-        
-        if "priority" in metadata:
-            metadata_comments.append(f"# Priority: {metadata['priority']}")
-        
-        if "tags" in metadata:
-            metadata_comments.append(f"# Tags: {', '.join(metadata['tags'])}")
-        
-        if "generated_at" in metadata:
-            metadata_comments.append(f"# Generated: {metadata['generated_at']}")
-        
-        if "requirements" in metadata:
-            metadata_comments.append(f"# Requirements: {', '.join(metadata['requirements'])}")
+        metadata_comments = [
+            f"# {label}: {value_format(metadata[key])}"
+            for key, label, value_format in _METADATA_SPEC
+            if key in metadata
+        ]
         
         # Add metadata to content
         if metadata_comments:
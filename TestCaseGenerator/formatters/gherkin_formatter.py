@@ -1,7 +1,22 @@
 """Gherkin formatter for generating BDD-style test scenarios."""
 
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import re
+import string
+import sys
+import types
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import zip_longest
+from typing import List, Dict, Any, Callable, ClassVar, FrozenSet, IO, Iterator, Optional, Tuple
+
+try:
+    # pyahocorasick matches all outline patterns in a single pass per action
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:
+    ahocorasick = None
 
 from models.test_models import TestCase, TestStep
 from models.input_models import TestCaseRequest
@@ -9,13 +24,144 @@ from models.input_models import TestCaseRequest
 
 logger = logging.getLogger(__name__)
 
+# Given steps (preconditions)
+_GIVEN_KEYWORDS = frozenset({
+    "ensure", "verify", "check", "confirm", "setup", "prepare",
+    "create", "have", "exist", "available", "logged in"
+})
 
-class GherkinFormatter:
-    """Formatter for generating Gherkin (BDD) test scenarios."""
+# When steps (actions)
+_WHEN_KEYWORDS = frozenset({
+    "click", "enter", "select", "submit", "navigate", "perform",
+    "execute", "run", "start", "initiate", "trigger", "send"
+})
+
+# Then steps (verifications)
+_THEN_KEYWORDS = frozenset({
+    "should", "will", "must", "verify", "confirm", "check",
+    "see", "display", "show", "appear", "receive", "get"
+})
+
+
+def _keyword_re(keywords: FrozenSet[str]) -> "re.Pattern[str]":
+    """Compile a keyword set into a single substring alternation."""
+    return re.compile("|".join(map(re.escape, sorted(keywords))))
+
+
+_GIVEN_RE = _keyword_re(_GIVEN_KEYWORDS)
+_WHEN_RE = _keyword_re(_WHEN_KEYWORDS)
+_THEN_RE = _keyword_re(_THEN_KEYWORDS)
+
+# Action phrases that suggest a data-driven scenario outline
+_DATA_PATTERNS = (
+    "test with", "verify with", "input", "enter", "select",
+    "different", "various", "multiple", "range"
+)
+_OUTLINE_RE = re.compile("|".join(map(re.escape, _DATA_PATTERNS)))
+
+_OUTLINE_AC: Any = None
+if ahocorasick is not None:
+    _OUTLINE_AC = ahocorasick.Automaton()
+    for _pattern in _DATA_PATTERNS:
+        _OUTLINE_AC.add_word(_pattern, _pattern)
+    _OUTLINE_AC.make_automaton()
+
+
+def _has_outline_pattern(action_lower: str) -> bool:
+    """Return whether a lowercased action contains any outline data pattern."""
+    if _OUTLINE_AC is not None:
+        return next(_OUTLINE_AC.iter(action_lower), None) is not None
+    return _OUTLINE_RE.search(action_lower) is not None
+
+# Separator for comma-delimited test data, absorbing surrounding whitespace
+_COMMA_RE = re.compile(r"\s*,\s*")
+
+# Examples table used when no step carries test data
+_DEFAULT_EXAMPLE_HEADERS = ("data_1", "data_2")
+_DEFAULT_EXAMPLE_ROWS = (
+    ("valid data", "expected result 1"),
+    ("invalid data", "expected result 2"),
+    ("boundary data", "expected result 3")
+)
+
+
+@lru_cache(maxsize=4096)
+def _classify_step(action_lower: str) -> str:
+    """Return the Gherkin keyword for a lowercased step action."""
+    if _GIVEN_RE.search(action_lower):
+        return "Given"
+    elif _WHEN_RE.search(action_lower):
+        return "When"
+    elif _THEN_RE.search(action_lower):
+        return "Then"
+    else:
+        return "When"
+
+
+def _split_template(template: str) -> Tuple[str, ...]:
+    """Split a format template into the literal chunks around its fields.
     
-    def __init__(self):
-        """Initialize the Gherkin formatter."""
-        self.feature_template = """Feature: {feature_name}
+    The result has one more chunk than the template has fields, so rendering
+    is a single join that interleaves the chunks with the field values.
+    """
+    chunks = [""]
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        chunks[-1] += literal
+        if field_name is not None:
+            chunks.append("")
+    return tuple(chunks)
+
+
+# Scenarios with at most this many steps get a generated straight-line emitter
+_MAX_GENERATED_STEPS = 32
+
+# Feature groups are formatted on worker threads only on free-threaded
+# builds; with the GIL the threads would just take turns
+_PARALLEL_GROUPS = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+# Under mypyc the step loop is native code, which beats the exec-generated
+# emitters since those always run in the interpreter. mypyc turns module
+# functions into native builtins, so a plain Python function means this
+# module is interpreted, however it was packaged or loaded.
+_COMPILED = not isinstance(_split_template, types.FunctionType)
+
+
+# Step fields laid out column-wise: actions, lowercased actions, test data
+# and expected results, each indexed by step position.
+_StepColumns = Tuple[List[str], List[str], List[Optional[str]], List[str]]
+
+
+@lru_cache(maxsize=_MAX_GENERATED_STEPS)
+def _scenario_steps_emitter(n_steps: int) -> Callable[[_StepColumns], str]:
+    """Generate a function rendering exactly n_steps regular scenario steps.
+    
+    The generated body unrolls the step loop into one join expression, so
+    each step costs a few local reads instead of a loop iteration and a
+    series of list appends.
+    """
+    lines = ["def emit_steps(columns):", "    actions, lowered, test_data, expected = columns"]
+    pieces = []
+    for index in range(n_steps):
+        lines.append(f"    action{index} = actions[{index}]")
+        lines.append(f"    keyword{index} = classify(lowered[{index}])")
+        lines.append(f"    data{index} = test_data[{index}]")
+        lines.append(f"    expected{index} = expected[{index}]")
+        if index:
+            pieces.append(repr("\n"))
+        pieces.append(
+            f"f'    {{keyword{index}}} {{action{index}}}'"
+            f" + (' with ' + data{index} if data{index} else '')"
+            f" + (' and ' + expected{index} if keyword{index} == 'Then' and expected{index} else '')"
+        )
+    lines.append(f"    return ''.join(({', '.join(pieces)},))")
+    namespace: Dict[str, Any] = {"classify": _classify_step}
+    exec(compile("\n".join(lines), f"<gherkin_steps_{n_steps}>", "exec"), namespace)
+    return namespace["emit_steps"]
+
+
+# Feature and scenario templates; module level so mypyc can evaluate the
+# class attributes derived from them
+_FEATURE_TMPL = """Feature: {feature_name}
   As a {user_role}
   I want to {user_action}
   So that {user_value}
@@ -25,11 +171,11 @@ class GherkinFormatter:
 
 {scenarios}"""
 
-        self.scenario_template = """
+_SCENARIO_TMPL = """
   Scenario: {scenario_title}
     {steps}"""
 
-        self.scenario_outline_template = """
+_SCENARIO_OUTLINE_TMPL = """
   Scenario Outline: {scenario_title}
     {steps}
     
@@ -37,39 +183,135 @@ class GherkinFormatter:
       {examples_header}
       {examples_data}"""
 
-        self.step_template = "    {keyword} {step_description}"
+
+class GherkinFormatter:
+    """Formatter for generating Gherkin (BDD) test scenarios."""
+    
+    __slots__ = ()
+    
+    # Literal chunks of the module templates, split once at import
+    _FEATURE_CHUNKS: ClassVar[Tuple[str, ...]] = _split_template(_FEATURE_TMPL)
+    _SCENARIO_CHUNKS: ClassVar[Tuple[str, ...]] = _split_template(_SCENARIO_TMPL)
+    _SCENARIO_OUTLINE_CHUNKS: ClassVar[Tuple[str, ...]] = _split_template(_SCENARIO_OUTLINE_TMPL)
     
-    def format_test_cases(self, test_cases: List[TestCase], request: TestCaseRequest) -> str:
-        """Format test cases into Gherkin feature file format."""
+    # Feature chunks pre-encoded as UTF-8 for format_test_cases_bytes
+    _FEATURE_CHUNKS_UTF8: ClassVar[Tuple[bytes, ...]] = tuple(map(str.encode, _FEATURE_CHUNKS))
+    
+    def format_test_cases(self, test_cases: List[TestCase], request: TestCaseRequest,
+                          feature_info: Optional[Dict[str, str]] = None) -> str:
+        """Format test cases into Gherkin feature file format.
+        
+        feature_info may be passed in when the caller has already extracted it.
+        """
         
         if not test_cases:
             return "# No test cases to format"
         
         try:
-            # Extract feature information from the first test case or request
-            feature_info = self._extract_feature_info(test_cases[0], request)
+            return "".join(self._iter_feature(test_cases, request, feature_info))
             
-            # Generate scenarios
-            scenarios = []
-            for test_case in test_cases:
-                scenario = self._format_scenario(test_case)
-                if scenario:
-                    scenarios.append(scenario)
+        except Exception as e:
+            logger.error("Error formatting test cases to Gherkin: %s", e)
+            return f"# Error formatting test cases: {e}"
+    
+    def write_feature(self, f: IO[str], test_cases: List[TestCase], request: TestCaseRequest,
+                      feature_info: Optional[Dict[str, str]] = None) -> None:
+        """Write the Gherkin feature file for test cases to a text file.
+        
+        Fragments are streamed with writelines instead of building the whole
+        feature in memory. On an error the message is written after whatever
+        output was already streamed.
+        """
+        
+        if not test_cases:
+            f.write("# No test cases to format")
+            return
+        
+        try:
+            f.writelines(self._iter_feature(test_cases, request, feature_info))
             
-            # Combine into feature file
-            feature_content = self.feature_template.format(
-                feature_name=feature_info["name"],
-                user_role=feature_info["user_role"],
-                user_action=feature_info["user_action"],
-                user_value=feature_info["user_value"],
-                scenarios="\n".join(scenarios)
-            )
+        except Exception as e:
+            logger.error("Error formatting test cases to Gherkin: %s", e)
+            f.write(f"# Error formatting test cases: {e}")
+    
+    def format_test_cases_bytes(self, test_cases: List[TestCase], request: TestCaseRequest,
+                                feature_info: Optional[Dict[str, str]] = None) -> bytes:
+        """Format test cases into a Gherkin feature file encoded as UTF-8.
+        
+        Produces the same bytes as encoding format_test_cases() output. The
+        template literals are pre-encoded and each scenario is encoded once
+        into a bytearray buffer.
+        """
+        
+        if not test_cases:
+            return b"# No test cases to format"
+        
+        try:
+            if feature_info is None:
+                feature_info = self._extract_feature_info(test_cases[0], request)
             
-            return feature_content
+            chunks = self._FEATURE_CHUNKS_UTF8
+            buf = bytearray(chunks[0])
+            buf += feature_info["name"].encode("utf-8")
+            buf += chunks[1]
+            buf += feature_info["user_role"].encode("utf-8")
+            buf += chunks[2]
+            buf += feature_info["user_action"].encode("utf-8")
+            buf += chunks[3]
+            buf += feature_info["user_value"].encode("utf-8")
+            buf += chunks[4]
+            
+            # Failed scenarios are dropped, as in _iter_feature
+            emitted = False
+            parts: List[str] = []
+            for test_case in test_cases:
+                parts.clear()
+                if not self._emit_scenario(parts, test_case):
+                    continue
+                if emitted:
+                    buf += b"\n"
+                emitted = True
+                buf += "".join(parts).encode("utf-8")
+            
+            buf += chunks[5]
+            return bytes(buf)
             
         except Exception as e:
-            logger.error(f"Error formatting test cases to Gherkin: {e}")
-            return f"# Error formatting test cases: {e}"
+            logger.error("Error formatting test cases to Gherkin: %s", e)
+            return f"# Error formatting test cases: {e}".encode("utf-8")
+    
+    def _iter_feature(self, test_cases: List[TestCase], request: TestCaseRequest,
+                      feature_info: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """Yield the fragments of a feature file for non-empty test_cases."""
+        
+        # Extract feature information from the first test case or request
+        if feature_info is None:
+            feature_info = self._extract_feature_info(test_cases[0], request)
+        
+        chunks = self._FEATURE_CHUNKS
+        yield chunks[0]
+        yield feature_info["name"]
+        yield chunks[1]
+        yield feature_info["user_role"]
+        yield chunks[2]
+        yield feature_info["user_action"]
+        yield chunks[3]
+        yield feature_info["user_value"]
+        yield chunks[4]
+        
+        # Scenarios are buffered individually so a failed one can be dropped
+        emitted = False
+        parts: List[str] = []
+        for test_case in test_cases:
+            parts.clear()
+            if not self._emit_scenario(parts, test_case):
+                continue
+            if emitted:
+                yield "\n"
+            emitted = True
+            yield from parts
+        
+        yield chunks[5]
     
     def _extract_feature_info(self, test_case: TestCase, request: TestCaseRequest) -> Dict[str, str]:
         """Extract feature information from test case and request."""
@@ -109,283 +351,255 @@ class GherkinFormatter:
     def _format_scenario(self, test_case: TestCase) -> Optional[str]:
         """Format a single test case into a Gherkin scenario."""
         
+        parts: List[str] = []
+        if not self._emit_scenario(parts, test_case):
+            return None
+        return "".join(parts)
+    
+    def _emit_scenario(self, parts: List[str], test_case: TestCase) -> bool:
+        """Append the fragments of a Gherkin scenario to parts.
+        
+        Returns False, leaving parts partially extended, if formatting fails.
+        This is the only place a scenario failure is caught, so one bad test
+        case is skipped without aborting the whole feature.
+        """
+        
         try:
-            # Check if this should be a scenario outline
-            if self._should_be_scenario_outline(test_case):
-                return self._format_scenario_outline(test_case)
-            
-            # Regular scenario
-            steps = self._format_scenario_steps(test_case.steps)
-            
-            scenario_content = self.scenario_template.format(
-                scenario_title=test_case.title,
-                steps="\n".join(steps)
-            )
-            
-            return scenario_content
+            self._emit_scenario_body(parts, test_case)
+            return True
             
         except Exception as e:
-            logger.warning(f"Failed to format scenario {test_case.test_id}: {e}")
-            return None
+            logger.warning("Failed to format scenario %s: %s", test_case.test_id, e)
+            return False
+    
+    def _emit_scenario_body(self, parts: List[str], test_case: TestCase) -> None:
+        """Append the fragments of a Gherkin scenario to parts, raising on failure."""
+        
+        columns = self._prep_steps(test_case.steps)
+        
+        # Check if this should be a scenario outline
+        if self._should_be_scenario_outline(columns[1]):
+            self._emit_scenario_outline(parts, test_case, columns)
+            return
+        
+        # Regular scenario
+        chunks = self._SCENARIO_CHUNKS
+        parts.append(chunks[0])
+        parts.append(test_case.title)
+        parts.append(chunks[1])
+        n_steps = len(columns[0])
+        if not _COMPILED and 0 < n_steps <= _MAX_GENERATED_STEPS:
+            parts.append(_scenario_steps_emitter(n_steps)(columns))
+        else:
+            self._emit_scenario_steps(parts, columns)
+        parts.append(chunks[2])
     
-    def _should_be_scenario_outline(self, test_case: TestCase) -> bool:
+    @staticmethod
+    def _prep_steps(steps: List[TestStep]) -> _StepColumns:
+        """Split steps into per-field columns, lowercasing each action once."""
+        
+        actions = [step.action for step in steps]
+        return (
+            actions,
+            [action.lower() for action in actions],
+            [step.test_data for step in steps],
+            [step.expected_result for step in steps],
+        )
+    
+    def _should_be_scenario_outline(self, lowered_actions: List[str]) -> bool:
         """Determine if a test case should be formatted as a scenario outline."""
         
         # Check if test case has multiple similar steps with different data
-        if len(test_case.steps) < 2:
+        if len(lowered_actions) < 2:
             return False
         
-        # Look for patterns that suggest scenario outline
-        step_actions = [step.action.lower() for step in test_case.steps]
-        
-        # Check for data-driven patterns
-        data_patterns = [
-            "test with", "verify with", "input", "enter", "select",
-            "different", "various", "multiple", "range"
-        ]
+        # Look for data-driven patterns, scanning each action once
+        return any(map(_has_outline_pattern, lowered_actions))
+    
+    def _emit_scenario_outline(self, parts: List[str], test_case: TestCase, columns: _StepColumns) -> None:
+        """Append the fragments of a scenario outline to parts."""
         
-        for pattern in data_patterns:
-            if any(pattern in action for action in step_actions):
-                return True
+        # Extract data variations from test steps
+        headers, rows = self._extract_data_variations(columns[2])
         
-        return False
+        # Generate examples table
+        examples_header, examples_data = self._generate_examples_table(headers, rows)
+        
+        # Emit steps with placeholders, then the examples
+        chunks = self._SCENARIO_OUTLINE_CHUNKS
+        parts.append(chunks[0])
+        parts.append(test_case.title)
+        parts.append(chunks[1])
+        self._emit_scenario_outline_steps(parts, columns)
+        parts.append(chunks[2])
+        parts.append(examples_header)
+        parts.append(chunks[3])
+        parts.append(examples_data)
+        parts.append(chunks[4])
     
-    def _format_scenario_outline(self, test_case: TestCase) -> str:
-        """Format a test case as a scenario outline."""
+    def _extract_data_variations(self, test_data: List[Optional[str]]) -> Tuple[List[str], List[Tuple[str, ...]]]:
+        """Extract data variations from test steps as examples table headers and rows.
         
-        # Extract data variations from test steps
-        data_variations = self._extract_data_variations(test_case.steps)
+        Each step with test data contributes one column (data_0, data_1, ...)
+        and its comma-separated values fill that column row by row.
+        """
         
-        # Format steps with placeholders
-        steps = self._format_scenario_outline_steps(test_case.steps)
+        columns = [_COMMA_RE.split(data.strip()) for data in test_data if data]
         
-        # Generate examples table
-        examples_header, examples_data = self._generate_examples_table(data_variations)
+        # If no variations found, use the default ones
+        if not columns:
+            return list(_DEFAULT_EXAMPLE_HEADERS), list(_DEFAULT_EXAMPLE_ROWS)
         
-        scenario_content = self.scenario_outline_template.format(
-            scenario_title=test_case.title,
-            steps="\n".join(steps),
-            examples_header=examples_header,
-            examples_data=examples_data
-        )
+        headers = [f"data_{index}" for index in range(len(columns))]
+        rows = list(zip_longest(*columns, fillvalue=""))
         
-        return scenario_content
-    
-    def _extract_data_variations(self, steps: List[TestStep]) -> List[Dict[str, str]]:
-        """Extract data variations from test steps."""
-        
-        variations = []
-        
-        # Look for test data in steps
-        for step in steps:
-            if step.test_data:
-                # Parse test data for variations
-                data_parts = step.test_data.split(",")
-                for i, part in enumerate(data_parts):
-                    if i < len(variations):
-                        variations[i][f"data_{len(variations[i])}"] = part.strip()
-                    else:
-                        variations.append({f"data_{len(variations)}": part.strip()})
-        
-        # If no variations found, create default ones
-        if not variations:
-            variations = [
-                {"data_1": "valid data", "data_2": "expected result 1"},
-                {"data_1": "invalid data", "data_2": "expected result 2"},
-                {"data_1": "boundary data", "data_2": "expected result 3"}
-            ]
-        
-        return variations
+        return headers, rows
     
-    def _format_scenario_outline_steps(self, steps: List[TestStep]) -> List[str]:
-        """Format steps for scenario outline with placeholders."""
+    def _emit_scenario_outline_steps(self, parts: List[str], columns: _StepColumns) -> None:
+        """Append newline-separated scenario outline steps with placeholders to parts."""
         
-        formatted_steps = []
+        classify = _classify_step
+        append = parts.append
+        actions, lowered, test_data, _ = columns
         
-        for step in steps:
-            # Replace specific data with placeholders
-            step_text = step.action
+        # Substituted step text keyed by (action, test data), for repeated steps
+        substituted: Dict[Tuple[str, str], str] = {}
+        
+        for index, action in enumerate(actions):
+            action_lower = lowered[index]
+            data = test_data[index]
             
             # Replace common data patterns with placeholders
-            if step.test_data:
-                step_text = step_text.replace(step.test_data, "<data_1>")
+            step_text = action
+            if data and data in action:
+                key = (action, data)
+                cached = substituted.get(key)
+                if cached is None:
+                    cached = substituted[key] = action.replace(data, "<data_1>")
+                step_text = cached
             
-            # Add expected result placeholder if needed
-            if "verify" in step.action.lower() or "check" in step.action.lower():
-                step_text = f"{step_text} <data_2>"
+            if index:
+                append("\n")
+            append("    ")
+            append(classify(action_lower))
+            append(" ")
+            append(step_text)
             
-            # Format the step
-            keyword = self._get_step_keyword(step)
-            formatted_step = self.step_template.format(
-                keyword=keyword,
-                step_description=step_text
-            )
-            
-            formatted_steps.append(formatted_step)
-        
-        return formatted_steps
+            # Add expected result placeholder if needed
+            if "verify" in action_lower or "check" in action_lower:
+                append(" <data_2>")
     
-    def _generate_examples_table(self, data_variations: List[Dict[str, str]]) -> tuple:
+    def _generate_examples_table(self, headers: List[str], rows: List[Tuple[str, ...]]) -> Tuple[str, str]:
         """Generate examples table for scenario outline."""
         
-        if not data_variations:
+        if not rows:
             return "| data_1 | data_2 |", "| valid | expected |"
         
-        # Get all unique keys
-        all_keys = set()
-        for variation in data_variations:
-            all_keys.update(variation.keys())
-        
-        keys = sorted(list(all_keys))
-        
-        # Generate header
-        header = "| " + " | ".join(keys) + " |"
-        
-        # Generate data rows
-        data_rows = []
-        for variation in data_variations:
-            row_data = [variation.get(key, "") for key in keys]
-            data_rows.append("| " + " | ".join(row_data) + " |")
+        header = "| " + " | ".join(headers) + " |"
+        data_rows = "\n      ".join("| " + " | ".join(row) + " |" for row in rows)
         
-        return header, "\n      ".join(data_rows)
+        return header, data_rows
     
-    def _format_scenario_steps(self, steps: List[TestStep]) -> List[str]:
-        """Format regular scenario steps."""
-        
-        formatted_steps = []
-        
-        for step in steps:
-            keyword = self._get_step_keyword(step)
+    def _emit_scenario_steps(self, parts: List[str], columns: _StepColumns) -> None:
+        """Append newline-separated regular scenario steps to parts."""
+        
+        # Keyword choice and emission happen in one pass per step
+        classify = _classify_step
+        append = parts.append
+        actions, lowered, test_data, expected = columns
+        
+        for index, action in enumerate(actions):
+            keyword = classify(lowered[index])
+            data = test_data[index]
+            expected_result = expected[index]
             
-            # Format step description
-            step_description = step.action
+            if index:
+                append("\n")
+            append("    ")
+            append(keyword)
+            append(" ")
+            append(action)
             
             # Add test data if available
-            if step.test_data:
-                step_description += f" with {step.test_data}"
+            if data:
+                append(" with ")
+                append(data)
             
             # Add expected result for verification steps
-            if keyword == "Then" and step.expected_result:
-                step_description += f" and {step.expected_result}"
-            
-            # Format the step
-            formatted_step = self.step_template.format(
-                keyword=keyword,
-                step_description=step_description
-            )
-            
-            formatted_steps.append(formatted_step)
-        
-        return formatted_steps
-    
-    def _get_step_keyword(self, step: TestStep) -> str:
-        """Determine the appropriate Gherkin keyword for a step."""
-        
-        action_lower = step.action.lower()
-        
-        # Given steps (preconditions)
-        given_keywords = [
-            "ensure", "verify", "check", "confirm", "setup", "prepare",
-            "create", "have", "exist", "available", "logged in"
-        ]
-        
-        # When steps (actions)
-        when_keywords = [
-            "click", "enter", "select", "submit", "navigate", "perform",
-            "execute", "run", "start", "initiate", "trigger", "send"
-        ]
-        
-        # Then steps (verifications)
-        then_keywords = [
-            "should", "will", "must", "verify", "confirm", "check",
-            "see", "display", "show", "appear", "receive", "get"
-        ]
-        
-        # Determine step type based on action content
-        if any(keyword in action_lower for keyword in given_keywords):
-            return "Given"
-        elif any(keyword in action_lower for keyword in when_keywords):
-            return "When"
-        elif any(keyword in action_lower for keyword in then_keywords):
-            return "Then"
-        else:
-            # Default based on step number or content analysis
-            if "verify" in action_lower or "check" in action_lower:
-                return "Then"
-            elif "ensure" in action_lower or "setup" in action_lower:
-                return "Given"
-            else:
-                return "When"
+            if keyword == "Then" and expected_result:
+                append(" and ")
+                append(expected_result)
     
     def format_single_test_case(self, test_case: TestCase) -> str:
         """Format a single test case as a standalone Gherkin scenario."""
         
-        try:
-            # Create a minimal feature for single test case
-            feature_name = test_case.title or "Test Scenario"
-            
-            # Format the scenario
-            scenario = self._format_scenario(test_case)
-            if not scenario:
-                return f"# Failed to format test case: {test_case.test_id}"
-            
-            # Create minimal feature
-            feature_content = f"""Feature: {feature_name}
+        # Format the scenario; _emit_scenario already absorbs its failures
+        scenario = self._format_scenario(test_case)
+        if not scenario:
+            return f"# Failed to format test case: {test_case.test_id}"
+        
+        # Create minimal feature for single test case
+        feature_name = test_case.title or "Test Scenario"
+        return f"""Feature: {feature_name}
 
   Background:
     Given the system is in a known state
 
 {scenario}"""
-            
-            return feature_content
-            
-        except Exception as e:
-            logger.error(f"Error formatting single test case: {e}")
-            return f"# Error formatting test case: {e}"
     
     def format_test_cases_by_type(self, test_cases: List[TestCase], request: TestCaseRequest) -> Dict[str, str]:
         """Format test cases grouped by type into separate feature files."""
         
-        grouped_cases = {}
+        grouped_cases: Dict[str, List[TestCase]] = defaultdict(list)
         
         # Group test cases by type
         for test_case in test_cases:
-            test_type = test_case.test_type.value
-            if test_type not in grouped_cases:
-                grouped_cases[test_type] = []
-            grouped_cases[test_type].append(test_case)
-        
-        # Format each group
-        formatted_features = {}
-        for test_type, cases in grouped_cases.items():
-            feature_name = f"{test_type.title()} Test Cases"
-            
-            # Create a modified request for this group
-            group_request = self._create_group_request(request, test_type)
-            
-            # Format the group
-            formatted_content = self.format_test_cases(cases, group_request)
-            
-            # Add feature name header
-            formatted_content = f"# {feature_name}\n\n{formatted_content}"
-            
-            formatted_features[test_type] = formatted_content
+            grouped_cases[test_case.test_type.value].append(test_case)
+        
+        # With a user story every group shares the same feature information
+        shared_feature_info = None
+        if request.user_story and test_cases:
+            shared_feature_info = self._extract_feature_info(test_cases[0], request)
+        
+        # Format each group; groups are independent of each other
+        test_types = list(grouped_cases)
+        
+        def format_group(test_type: str) -> str:
+            return self._format_group(test_type, grouped_cases[test_type], request, shared_feature_info)
+        
+        if _PARALLEL_GROUPS and len(test_types) > 1:
+            max_workers = min(len(test_types), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                contents = list(executor.map(format_group, test_types))
+        else:
+            contents = list(map(format_group, test_types))
         
-        return formatted_features
+        return dict(zip(test_types, contents))
     
-    def _create_group_request(self, original_request: TestCaseRequest, test_type: str) -> TestCaseRequest:
-        """Create a modified request for a specific test type group."""
+    def _format_group(self, test_type: str, cases: List[TestCase], request: TestCaseRequest,
+                      feature_info: Optional[Dict[str, str]]) -> str:
+        """Format one test type group as a feature file with a name header."""
         
-        # Create a copy of the original request with modified test specification
-        from copy import deepcopy
+        feature_name = f"{test_type.title()} Test Cases"
         
-        group_request = deepcopy(original_request)
+        # Create a modified request for this group
+        group_request = self._create_group_request(request, test_type)
         
-        # Update test specification for the group
-        group_request.test_specification.test_types = [test_type]
-        group_request.test_specification.output_format = "gherkin"
+        # Format the group
+        formatted_content = self.format_test_cases(cases, group_request, feature_info)
         
-        return group_request
+        # Add feature name header
+        return f"# {feature_name}\n\n{formatted_content}"
+    
+    def _create_group_request(self, original_request: TestCaseRequest, test_type: str) -> TestCaseRequest:
+        """Create a modified request for a specific test type group."""
+        
+        # Shallow copies suffice: only the test specification differs, and it
+        # is replaced rather than mutated, so the original request is untouched
+        group_spec = original_request.test_specification.model_copy(
+            update={"test_types": [test_type], "output_format": "gherkin"}
+        )
+        return original_request.model_copy(update={"test_specification": group_spec})
     
     def add_gherkin_metadata(self, content: str, metadata: Dict[str, Any]) -> str:
         """Add metadata comments to Gherkin content."""
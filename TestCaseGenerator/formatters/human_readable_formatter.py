@@ -1,15 +1,106 @@
 """Human readable formatter for generating documentation-style test cases."""
 
 import logging
-from typing import List, Dict, Any, Optional
+import string
+from collections import Counter, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter
+from typing import List, Dict, Any, IO, Iterator, Optional, Set, Tuple
 from datetime import datetime
 
-from models.test_models import TestCase, TestStep
+from models.test_models import TestCase
 from models.input_models import TestCaseRequest
 
 
 logger = logging.getLogger(__name__)
 
+# Enum value getters for bulk extraction in C
+_TYPE_GETTER = attrgetter("test_type.value")
+_PRIORITY_GETTER = attrgetter("priority.value")
+
+# Compiled template: (literal, field name or None) pairs
+_CompiledTemplate = Tuple[Tuple[str, Optional[str]], ...]
+
+
+@lru_cache(maxsize=None)
+def _compile_template(template: str) -> _CompiledTemplate:
+    """Split a format template into (literal, field name) pairs.
+    
+    Keyed on the template text, so each template is parsed only once even
+    though the formatter keeps its templates as plain instance attributes.
+    """
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in string.Formatter().parse(template)
+    )
+
+
+@dataclass
+class _TestCaseStats:
+    """Aggregates over a batch of test cases, collected in a single pass."""
+    
+    total_count: int = 0
+    total_steps: int = 0
+    edge_case_count: int = 0
+    type_counts: Counter = field(default_factory=Counter)
+    priority_counts: Counter = field(default_factory=Counter)
+    covered_acceptance_criteria: Set[str] = field(default_factory=set)
+
+
+@lru_cache(maxsize=512)
+def _preconditions_for(tags_lower: str, data_preconditions: Tuple[str, ...]) -> str:
+    """Build the preconditions line for a tag set and the test data preconditions.
+    
+    Test cases in a batch tend to share tags, so the line is cached by value.
+    tags_lower is the test case's tags as returned by _lower_tags().
+    """
+    
+    preconditions = []
+    
+    # Add system state preconditions
+    preconditions.append("System is in a known state")
+    
+    # Add user-related preconditions
+    if "user" in tags_lower:
+        preconditions.append("User is logged into the system")
+    
+    # Add role-related preconditions
+    if "admin" in tags_lower:
+        preconditions.append("User has admin privileges")
+    
+    # Add data-related preconditions
+    preconditions.extend(data_preconditions)
+    
+    return " | ".join(preconditions)
+
+
+def _lower_tags(tags: List[str]) -> str:
+    """Lowercase tags into one space-separated string for substring checks.
+    
+    No tag keyword contains a space, so a keyword is found in the joined
+    string exactly when some tag contains it.
+    """
+    return " ".join(tags).lower()
+
+
+def _emit_template(parts: List[str], template: str, values: Dict[str, Any]) -> None:
+    """Append the fragments of template rendered with values to parts.
+    
+    Joining the result equals template.format_map(values), except that list
+    values are taken as already rendered fragments and spliced in as is.
+    """
+    append = parts.append
+    for literal, field_name in _compile_template(template):
+        append(literal)
+        if field_name is not None:
+            value = values[field_name]
+            if isinstance(value, list):
+                parts.extend(value)
+            else:
+                append(format(value))
+
 
 class HumanReadableFormatter:
     """Formatter for generating human-readable test case documentation."""
@@ -57,48 +148,89 @@ class HumanReadableFormatter:
 
 ---
 """
-
-        self.step_template = """{step_number}. **{action}**
-   - Expected Result: {expected_result}
-   - Test Data: {test_data}
-   - Notes: {notes}"""
     
-    def format_test_cases(self, test_cases: List[TestCase], request: TestCaseRequest) -> str:
-        """Format test cases into human-readable documentation."""
+    def format_test_cases(self, test_cases: List[TestCase], request: TestCaseRequest,
+                          timestamp: Optional[str] = None) -> str:
+        """Format test cases into human-readable documentation.
+        
+        timestamp is the generated time shown in the summary; it defaults to now.
+        """
         
         if not test_cases:
             return "# No test cases to format"
         
         try:
-            # Generate overview
-            overview = self._generate_overview(test_cases, request)
-            
-            # Format individual test cases
-            formatted_cases = []
-            for test_case in test_cases:
-                case_content = self._format_single_test_case(test_case)
-                if case_content:
-                    formatted_cases.append(case_content)
-            
-            # Generate summary statistics
-            summary_stats = self._generate_summary_stats(test_cases)
-            
-            # Combine into complete documentation
-            complete_doc = self.template.format(
-                overview=overview,
-                test_cases="\n".join(formatted_cases),
-                total_count=len(test_cases),
-                test_types=", ".join(summary_stats["test_types"]),
-                priority_distribution=summary_stats["priority_distribution"],
-                generated_timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            )
-            
-            return complete_doc
+            return "".join(self._iter_document(test_cases, request, timestamp))
             
         except Exception as e:
             logger.error(f"Error formatting test cases to human readable: {e}")
             return f"# Error formatting test cases: {e}"
     
+    def write_test_cases(self, f: IO[str], test_cases: List[TestCase], request: TestCaseRequest,
+                         timestamp: Optional[str] = None) -> None:
+        """Write human-readable documentation for test cases to a text file.
+        
+        Fragments are streamed with writelines instead of building the whole
+        document in memory. On an error the message is written after whatever
+        output was already streamed.
+        """
+        
+        if not test_cases:
+            f.write("# No test cases to format")
+            return
+        
+        try:
+            f.writelines(self._iter_document(test_cases, request, timestamp))
+            
+        except Exception as e:
+            logger.error(f"Error formatting test cases to human readable: {e}")
+            f.write(f"# Error formatting test cases: {e}")
+    
+    def _iter_document(self, test_cases: List[TestCase], request: TestCaseRequest,
+                       timestamp: Optional[str] = None) -> Iterator[str]:
+        """Yield the fragments of the documentation for non-empty test_cases."""
+        
+        # Generate overview
+        overview = self._generate_overview(test_cases, request)
+        
+        # Lowercased tags are computed once per test case and shared by
+        # the preconditions and the statistics
+        lowered_tags = [_lower_tags(test_case.tags) for test_case in test_cases]
+        
+        # Generate summary statistics
+        summary_stats = self._generate_summary_stats(self._collect_stats(test_cases, lowered_tags))
+        
+        values = {
+            "overview": overview,
+            "total_count": len(test_cases),
+            "test_types": ", ".join(summary_stats["test_types"]),
+            "priority_distribution": summary_stats["priority_distribution"],
+            "generated_timestamp": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        
+        # Test cases are formatted lazily as the template reaches them
+        for literal, field_name in _compile_template(self.template):
+            yield literal
+            if field_name == "test_cases":
+                yield from self._iter_test_cases(test_cases, lowered_tags)
+            elif field_name is not None:
+                yield format(values[field_name])
+    
+    def _iter_test_cases(self, test_cases: List[TestCase], lowered_tags: List[str]) -> Iterator[str]:
+        """Yield the fragments of newline-separated test cases, skipping failures."""
+        
+        # Cases are buffered individually so a failed one can be dropped
+        emitted = False
+        parts: List[str] = []
+        for test_case, tags_lower in zip(test_cases, lowered_tags):
+            parts.clear()
+            if not self._emit_single_test_case(parts, test_case, tags_lower):
+                continue
+            if emitted:
+                yield "\n"
+            emitted = True
+            yield from parts
+    
     def _generate_overview(self, test_cases: List[TestCase], request: TestCaseRequest) -> str:
         """Generate overview section for the documentation."""
         
@@ -113,8 +245,8 @@ class HumanReadableFormatter:
         
         # Add acceptance criteria
         if request.acceptance_criteria:
-            overview_parts.append(f"""**Acceptance Criteria:**
-{chr(10).join(f"- {criteria}" for criteria in request.acceptance_criteria.criteria_list)}""")
+            criteria_text = "\n".join(f"- {criteria}" for criteria in request.acceptance_criteria.criteria_list)
+            overview_parts.append(f"**Acceptance Criteria:**\n{criteria_text}")
         
         # Add system context if available
         if request.system_context:
@@ -127,8 +259,8 @@ class HumanReadableFormatter:
                 context_parts.append(f"- **Constraints:** {', '.join(request.system_context.constraints)}")
             
             if context_parts:
-                overview_parts.append(f"""**System Context:**
-{chr(10).join(context_parts)}""")
+                context_text = "\n".join(context_parts)
+                overview_parts.append(f"**System Context:**\n{context_text}")
         
         # Add test specification
         spec = request.test_specification
@@ -144,56 +276,91 @@ class HumanReadableFormatter:
         
         return "\n\n".join(overview_parts)
     
-    def _format_single_test_case(self, test_case: TestCase) -> str:
+    def _format_single_test_case(self, test_case: TestCase) -> Optional[str]:
         """Format a single test case into human-readable format."""
         
+        parts: List[str] = []
+        if not self._emit_single_test_case(parts, test_case):
+            return None
+        return "".join(parts)
+    
+    def _emit_single_test_case(self, parts: List[str], test_case: TestCase,
+                               tags_lower: Optional[str] = None) -> bool:
+        """Append the fragments of a single test case to parts.
+        
+        Returns False, leaving parts partially extended, if formatting fails.
+        """
+        
+        # Reject records without an identity up front
+        if test_case is None or not test_case.test_id:
+            logger.warning("Skipping test case without a test ID")
+            return False
+        
         try:
-            # Format test steps
+            # One pass over the steps formats them as newline-separated
+            # fragments and collects the unique expected results and step notes
             steps_content = []
+            seen_results = set()
+            unique_results = []
+            notes_entries = []
             for i, step in enumerate(test_case.steps, 1):
-                step_content = self.step_template.format(
-                    step_number=i,
-                    action=step.action,
-                    expected_result=step.expected_result or "Not specified",
-                    test_data=step.test_data or "Not specified",
-                    notes=step.notes or "No additional notes"
+                expected_result = step.expected_result
+                step_notes = step.notes
+                if i > 1:
+                    steps_content.append("\n")
+                steps_content.append(
+                    f"{i}. **{step.action}**\n"
+                    f"   - Expected Result: {expected_result or 'Not specified'}\n"
+                    f"   - Test Data: {step.test_data or 'Not specified'}\n"
+                    f"   - Notes: {step_notes or 'No additional notes'}"
                 )
-                steps_content.append(step_content)
+                if expected_result and expected_result not in seen_results:
+                    seen_results.add(expected_result)
+                    unique_results.append(expected_result)
+                if step_notes and step_notes != "No additional notes":
+                    notes_entries.append(f"Step {i}: {step_notes}")
             
             # Get test data information
             test_data_info = self._format_test_data(test_case.test_data)
             
             # Get preconditions
-            preconditions = self._get_preconditions(test_case)
+            preconditions = self._get_preconditions(test_case, tags_lower)
+            
+            # Expected results summary
+            expected_results = " | ".join(unique_results) if unique_results else "Not specified"
             
-            # Get expected results summary
-            expected_results = self._get_expected_results_summary(test_case.steps)
+            # Add test case level notes
+            if test_case.result and test_case.result.status.value != "draft":
+                notes_entries.append(f"Status: {test_case.result.status.value}")
             
-            # Get notes
-            notes = self._get_test_case_notes(test_case)
+            if test_case.dependencies:
+                notes_entries.append(f"Dependencies: {', '.join(test_case.dependencies)}")
+            
+            notes = " | ".join(notes_entries) if notes_entries else "No additional notes"
             
             # Format the test case
-            case_content = self.test_case_template.format(
-                test_id=test_case.test_id,
-                title=test_case.title,
-                description=test_case.description,
-                test_type=test_case.test_type.value,
-                priority=test_case.priority.value,
-                test_level=test_case.test_level,
-                tags=", ".join(test_case.tags) if test_case.tags else "None",
-                requirements=", ".join(test_case.requirements) if test_case.requirements else "None",
-                preconditions=preconditions,
-                steps="\n".join(steps_content),
-                expected_results=expected_results,
-                test_data=test_data_info,
-                notes=notes
-            )
+            _emit_template(parts, self.test_case_template, {
+                "test_id": test_case.test_id,
+                "title": test_case.title,
+                "description": test_case.description,
+                "test_type": test_case.test_type.value,
+                "priority": test_case.priority.value,
+                "test_level": test_case.test_level,
+                "tags": ", ".join(test_case.tags) if test_case.tags else "None",
+                "requirements": ", ".join(test_case.requirements) if test_case.requirements else "None",
+                "preconditions": preconditions,
+                "steps": steps_content,
+                "expected_results": expected_results,
+                "test_data": test_data_info,
+                "notes": notes
+            })
             
-            return case_content
+            return True
             
-        except Exception as e:
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            # Malformed optional fields skip the case; anything else propagates
             logger.warning(f"Failed to format test case {test_case.test_id}: {e}")
-            return None
+            return False
     
     def _format_test_data(self, test_data) -> str:
         """Format test data information."""
@@ -220,80 +387,55 @@ class HumanReadableFormatter:
         
         return " | ".join(data_parts) if data_parts else "Not specified"
     
-    def _get_preconditions(self, test_case: TestCase) -> str:
+    def _get_preconditions(self, test_case: TestCase, tags_lower: Optional[str] = None) -> str:
         """Get preconditions for the test case."""
         
-        preconditions = []
-        
-        # Add system state preconditions
-        preconditions.append("System is in a known state")
+        if tags_lower is None:
+            tags_lower = _lower_tags(test_case.tags)
         
-        # Add user-related preconditions
-        if any("user" in tag.lower() for tag in test_case.tags):
-            preconditions.append("User is logged into the system")
-        
-        # Add role-related preconditions
-        if any("admin" in tag.lower() for tag in test_case.tags):
-            preconditions.append("User has admin privileges")
-        
-        # Add data-related preconditions
+        data_preconditions: Tuple[str, ...] = ()
         if test_case.test_data and test_case.test_data.preconditions:
-            preconditions.extend(test_case.test_data.preconditions)
+            data_preconditions = tuple(test_case.test_data.preconditions)
         
-        return " | ".join(preconditions)
+        return _preconditions_for(tags_lower, data_preconditions)
     
-    def _get_expected_results_summary(self, steps: List[TestStep]) -> str:
-        """Get a summary of expected results from test steps."""
-        
-        if not steps:
-            return "Not specified"
-        
-        # Collect all expected results
-        expected_results = []
-        for step in steps:
-            if step.expected_result:
-                expected_results.append(step.expected_result)
-        
-        if not expected_results:
-            return "Not specified"
-        
-        # Return unique expected results
-        unique_results = list(dict.fromkeys(expected_results))  # Preserve order
-        return " | ".join(unique_results)
+    def _collect_stats(self, test_cases: List[TestCase],
+                       lowered_tags: Optional[List[str]] = None) -> _TestCaseStats:
+        """Collect the counts used by the summary sections in one pass over test_cases.
+        
+        lowered_tags holds each test case's _lower_tags() when already computed.
+        """
+        
+        if lowered_tags is None:
+            lowered_tags = [_lower_tags(tc.tags) for tc in test_cases]
+        
+        # The running totals are kept in locals
+        total_steps = 0
+        edge_case_count = 0
+        covered_ac: Set[str] = set()
+        
+        for tc, tags_lower in zip(test_cases, lowered_tags):
+            total_steps += len(tc.steps)
+            if "edge" in tc.title.lower() or "edge" in tags_lower:
+                edge_case_count += 1
+            for req in tc.requirements:
+                if req.startswith("AC-"):
+                    covered_ac.add(req)
+        
+        return _TestCaseStats(
+            total_count=len(test_cases),
+            total_steps=total_steps,
+            edge_case_count=edge_case_count,
+            type_counts=Counter(map(_TYPE_GETTER, test_cases)),
+            priority_counts=Counter(map(_PRIORITY_GETTER, test_cases)),
+            covered_acceptance_criteria=covered_ac,
+        )
     
-    def _get_test_case_notes(self, test_case: TestCase) -> str:
-        """Get additional notes for the test case."""
-        
-        notes = []
-        
-        # Add step notes
-        for i, step in enumerate(test_case.steps, 1):
-            if step.notes and step.notes != "No additional notes":
-                notes.append(f"Step {i}: {step.notes}")
-        
-        # Add test case level notes
-        if test_case.result and test_case.result.status.value != "draft":
-            notes.append(f"Status: {test_case.result.status.value}")
-        
-        if test_case.dependencies:
-            notes.append(f"Dependencies: {', '.join(test_case.dependencies)}")
-        
-        return " | ".join(notes) if notes else "No additional notes"
-    
-    def _generate_summary_stats(self, test_cases: List[TestCase]) -> Dict[str, Any]:
+    def _generate_summary_stats(self, stats: _TestCaseStats) -> Dict[str, Any]:
         """Generate summary statistics for the test cases."""
         
-        # Count test types
-        test_types = {}
-        for tc in test_cases:
-            tc_type = tc.test_type.value
-            test_types[tc_type] = test_types.get(tc_type, 0) + 1
-        
-        # Count priorities
-        priorities = {}
-        for tc in test_cases:
-            priority = tc.priority.value
-            priorities[priority] = priorities.get(priority, 0) + 1
+        test_types = stats.type_counts
+        priorities = stats.priority_counts
         
         # Format priority distribution
         priority_distribution = ", ".join([f"{priority}: {count}" for priority, count in priorities.items()])
@@ -303,47 +445,59 @@ class HumanReadableFormatter:
             "priority_distribution": priority_distribution
         }
     
-    def format_test_cases_by_type(self, test_cases: List[TestCase], request: TestCaseRequest) -> Dict[str, str]:
-        """Format test cases grouped by type into separate documentation files."""
+    def format_test_cases_by_type(self, test_cases: List[TestCase], request: TestCaseRequest,
+                                  executor: Optional[Executor] = None) -> Dict[str, str]:
+        """Format test cases grouped by type into separate documentation files.
+
+        Groups are independent, so a caller-owned ``executor`` may format
+        them concurrently; the output is the same with or without one.
+        """
         
-        grouped_cases = {}
+        grouped_cases: Dict[str, List[TestCase]] = defaultdict(list)
         
         # Group test cases by type
         for test_case in test_cases:
-            test_type = test_case.test_type.value
-            if test_type not in grouped_cases:
-                grouped_cases[test_type] = []
-            grouped_cases[test_type].append(test_case)
+            grouped_cases[test_case.test_type.value].append(test_case)
+        
+        # Every group document shows the same generated time
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Format each group
-        formatted_docs = {}
-        for test_type, cases in grouped_cases.items():
-            # Create a modified request for this group
-            group_request = self._create_group_request(request, test_type)
-            
-            # Format the group
-            formatted_content = self.format_test_cases(cases, group_request)
-            
-            # Add section header
-            formatted_content = f"# {test_type.title()} Test Cases\n\n{formatted_content}"
-            
-            formatted_docs[test_type] = formatted_content
+        group_args = [
+            (test_type, cases, self._create_group_request(request, test_type), timestamp)
+            for test_type, cases in grouped_cases.items()
+        ]
+        if executor is not None and len(group_args) > 1:
+            if isinstance(executor, ProcessPoolExecutor):
+                # Ship this instance's templates rather than the instance itself
+                templates = [(self.template, self.test_case_template)] * len(group_args)
+                contents = list(executor.map(_format_type_group, templates, *zip(*group_args)))
+            else:
+                contents = list(executor.map(self._format_group, *zip(*group_args)))
+        else:
+            contents = [self._format_group(*args) for args in group_args]
+        
+        return {args[0]: content for args, content in zip(group_args, contents)}
+    
+    def _format_group(self, test_type: str, cases: List[TestCase], group_request: TestCaseRequest,
+                      timestamp: str) -> str:
+        """Format one test type group as a documentation file with a section header."""
+        
+        # Format the group
+        formatted_content = self.format_test_cases(cases, group_request, timestamp)
         
-        return formatted_docs
+        # Add section header
+        return f"# {test_type.title()} Test Cases\n\n{formatted_content}"
     
     def _create_group_request(self, original_request: TestCaseRequest, test_type: str) -> TestCaseRequest:
         """Create a modified request for a specific test type group."""
         
-        # Create a copy of the original request with modified test specification
-        from copy import deepcopy
-        
-        group_request = deepcopy(original_request)
-        
-        # Update test specification for the group
-        group_request.test_specification.test_types = [test_type]
-        group_request.test_specification.output_format = "human"
-        
-        return group_request
+        # Shallow copies suffice: only the test specification differs, and it
+        # is replaced rather than mutated, so the original request is untouched
+        group_spec = original_request.test_specification.model_copy(
+            update={"test_types": [test_type], "output_format": "human"}
+        )
+        return original_request.model_copy(update={"test_specification": group_spec})
     
     def format_single_test_case(self, test_case: TestCase) -> str:
         """Format a single test case as standalone documentation."""
@@ -390,11 +544,14 @@ class HumanReadableFormatter:
             return "# No test cases to summarize"
         
         try:
+            # Collect the counts every section is built from
+            stats = self._collect_stats(test_cases)
+            
             # Generate summary statistics
-            summary_stats = self._generate_summary_stats(test_cases)
+            summary_stats = self._generate_summary_stats(stats)
             
             # Calculate coverage metrics
-            coverage_metrics = self._calculate_coverage_metrics(test_cases, request)
+            coverage_metrics = self._calculate_coverage_metrics(stats, request)
             
             # Generate executive summary
             executive_summary = f"""# Test Case Executive Summary
@@ -411,10 +568,10 @@ This document provides a high-level summary of the generated test cases for the
 {coverage_metrics}
 
 ## Test Case Distribution
-{self._generate_test_distribution(test_cases)}
+{self._generate_test_distribution(stats)}
 
 ## Recommendations
-{self._generate_recommendations(test_cases, request)}
+{self._generate_recommendations(stats, request)}
 
 ## Generated
 {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
@@ -426,7 +583,7 @@ This document provides a high-level summary of the generated test cases for the
             logger.error(f"Error generating executive summary: {e}")
             return f"# Error generating executive summary: {e}"
     
-    def _calculate_coverage_metrics(self, test_cases: List[TestCase], request: TestCaseRequest) -> str:
+    def _calculate_coverage_metrics(self, stats: _TestCaseStats, request: TestCaseRequest) -> str:
         """Calculate and format coverage metrics."""
         
         metrics = []
@@ -434,75 +591,64 @@ This document provides a high-level summary of the generated test cases for the
         # Acceptance criteria coverage
         if request.acceptance_criteria:
             ac_count = len(request.acceptance_criteria.criteria_list)
-            covered_ac = len(set([req for tc in test_cases for req in tc.requirements if req.startswith("AC-")]))
+            covered_ac = len(stats.covered_acceptance_criteria)
             ac_coverage = (covered_ac / ac_count) * 100 if ac_count > 0 else 0
             metrics.append(f"- **Acceptance Criteria Coverage:** {ac_coverage:.1f}% ({covered_ac}/{ac_count})")
         
         # Test type coverage
         requested_types = set(request.test_specification.test_types)
-        generated_types = set(tc.test_type.value for tc in test_cases)
+        generated_types = set(stats.type_counts)
         type_coverage = len(generated_types.intersection(requested_types)) / len(requested_types) * 100 if requested_types else 0
         metrics.append(f"- **Test Type Coverage:** {type_coverage:.1f}%")
         
         # Priority coverage
         priorities = ["low", "medium", "high", "critical"]
-        priority_coverage = len(set(tc.priority.value for tc in test_cases)) / len(priorities) * 100
+        priority_coverage = len(stats.priority_counts) / len(priorities) * 100
         metrics.append(f"- **Priority Coverage:** {priority_coverage:.1f}%")
         
         return "\n".join(metrics)
     
-    def _generate_test_distribution(self, test_cases: List[TestCase]) -> str:
+    def _generate_test_distribution(self, stats: _TestCaseStats) -> str:
         """Generate test case distribution information."""
         
-        # Group by test type
-        type_distribution = {}
-        for tc in test_cases:
-            tc_type = tc.test_type.value
-            type_distribution[tc_type] = type_distribution.get(tc_type, 0) + 1
-        
-        # Group by priority
-        priority_distribution = {}
-        for tc in test_cases:
-            priority = tc.priority.value
-            priority_distribution[priority] = priority_distribution.get(priority, 0) + 1
+        type_distribution = stats.type_counts
+        priority_distribution = stats.priority_counts
         
         distribution_text = []
         
         # Test type distribution
-        type_text = "**By Test Type:**\n"
-        for tc_type, count in type_distribution.items():
-            type_text += f"- {tc_type.title()}: {count} test cases\n"
+        type_text = "**By Test Type:**\n" + "".join(
+            f"- {tc_type.title()}: {count} test cases\n" for tc_type, count in type_distribution.items()
+        )
         distribution_text.append(type_text)
         
         # Priority distribution
-        priority_text = "**By Priority:**\n"
-        for priority, count in priority_distribution.items():
-            priority_text += f"- {priority.title()}: {count} test cases\n"
+        priority_text = "**By Priority:**\n" + "".join(
+            f"- {priority.title()}: {count} test cases\n" for priority, count in priority_distribution.items()
+        )
         distribution_text.append(priority_text)
         
         return "\n".join(distribution_text)
     
-    def _generate_recommendations(self, test_cases: List[TestCase], request: TestCaseRequest) -> List[str]:
+    def _generate_recommendations(self, stats: _TestCaseStats, request: TestCaseRequest) -> List[str]:
         """Generate recommendations based on test case analysis."""
         
         recommendations = []
         
         # Check for missing test types
         requested_types = set(request.test_specification.test_types)
-        generated_types = set(tc.test_type.value for tc in test_cases)
+        generated_types = set(stats.type_counts)
         missing_types = requested_types - generated_types
         
         if missing_types:
             recommendations.append(f"Consider generating additional test cases for: {', '.join(missing_types)}")
         
         # Check priority distribution
-        priorities = [tc.priority.value for tc in test_cases]
-        if not any(p == "critical" for p in priorities):
+        if not stats.priority_counts["critical"]:
             recommendations.append("Consider adding critical priority test cases for high-risk functionality")
         
         # Check test step quality
-        total_steps = sum(len(tc.steps) for tc in test_cases)
-        avg_steps = total_steps / len(test_cases) if test_cases else 0
+        avg_steps = stats.total_steps / stats.total_count if stats.total_count else 0
         
         if avg_steps < 2:
             recommendations.append("Some test cases may benefit from more detailed step definitions")
@@ -510,8 +656,7 @@ This document provides a high-level summary of the generated test cases for the
             recommendations.append("Consider breaking down complex test cases into smaller, focused tests")
         
         # Check for edge cases
-        edge_case_count = len([tc for tc in test_cases if "edge" in tc.title.lower() or "edge" in tc.tags])
-        if edge_case_count < len(test_cases) * 0.2:  # Less than 20% edge cases
+        if stats.edge_case_count < stats.total_count * 0.2:  # Less than 20% edge cases
             recommendations.append("Consider adding more edge case and negative scenario test cases")
         
         if not recommendations:
@@ -549,3 +694,21 @@ This document provides a high-level summary of the generated test cases for the
             content = f"{metadata_header}\n\n{content}"
         
         return content
+
+
+_worker_formatter: Optional[HumanReadableFormatter] = None
+
+
+def _format_type_group(templates: Tuple[str, str], test_type: str, cases: List[TestCase],
+                       group_request: TestCaseRequest, timestamp: str) -> str:
+    """Process pool worker for format_test_cases_by_type.
+
+    Module-level so only the group arguments and the caller's (document,
+    test case) templates are pickled. Each worker process reuses one formatter
+    and runs one task at a time, so the templates are simply swapped in.
+    """
+    global _worker_formatter
+    if _worker_formatter is None:
+        _worker_formatter = HumanReadableFormatter()
+    _worker_formatter.template, _worker_formatter.test_case_template = templates
+    return _worker_formatter._format_group(test_type, cases, group_request, timestamp)
@@ -1,7 +1,8 @@
 """Step-driven formatter for generating structured test cases with detailed steps and test data."""
 
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Tuple
 
 from models.test_models import TestCase, TestStep
 from models.input_models import TestCaseRequest
@@ -9,6 +10,25 @@ from models.input_models import TestCaseRequest
 
 logger = logging.getLogger(__name__)
 
+# Numeric settings recognised in step actions, e.g. "Set gain = 2"
+_GAIN_RE = re.compile(r'gain\s*=\s*(\d+)', re.IGNORECASE)
+_OFFSET_RE = re.compile(r'offset\s*=\s*(\d+)', re.IGNORECASE)
+_RAW_RE = re.compile(r'raw\s*=\s*(\d+)', re.IGNORECASE)
+_VALUE_RE = re.compile(r'value\s*=\s*(\d+)', re.IGNORECASE)
+
+# Placeholder expected results that say nothing about the outcome
+_GENERIC_EXPECTED_RESULTS = frozenset({
+    "Precondition satisfied", "Action completed", "Expected result achieved"
+})
+
+# (label, pattern) pairs in the order they are reported as test data
+_TEST_DATA_PATTERNS = (
+    ("Gain", _GAIN_RE),
+    ("Offset", _OFFSET_RE),
+    ("Raw", _RAW_RE),
+    ("Value", _VALUE_RE),
+)
+
 
 class StepDrivenFormatter:
     """Formatter for generating step-driven test cases with detailed test data."""
@@ -34,8 +54,9 @@ class StepDrivenFormatter:
     def _format_single_test_case(self, test_case: TestCase) -> str:
         """Format a single test case into step-driven format."""
         
-        # Extract test data from steps
-        test_data = self._extract_test_data(test_case.steps)
+        # Extract test data, the last meaningful expected result and the
+        # calculation inputs from steps in one pass
+        test_data, last_expected_result, calculation = self._scan_steps(test_case.steps)
         
         # Format steps
         steps_text = self._format_steps(test_case.steps)
@@ -46,7 +67,7 @@ Test Case Name: {test_case.title}
 Steps:
 {steps_text}
 Test Data: {test_data}
-Expected Result: {self._extract_expected_result(test_case.steps)}
+Expected Result: {self._extract_expected_result(test_case.steps, last_expected_result, calculation)}
 Actual Result:"""
         
         return formatted
@@ -61,84 +82,62 @@ Actual Result:"""
         for i, step in enumerate(steps, 1):
             # Combine action and expected result for step description
             step_desc = step.action
-            if step.expected_result and step.expected_result != "Precondition satisfied" and step.expected_result != "Action completed" and step.expected_result != "Expected result achieved":
+            if step.expected_result and step.expected_result not in _GENERIC_EXPECTED_RESULTS:
                 step_desc += f" - {step.expected_result}"
             
             formatted_steps.append(f"\t{i}.\t{step_desc}")
         
         return "\n".join(formatted_steps)
     
-    def _extract_test_data(self, steps: List[TestStep]) -> str:
-        """Extract test data from steps."""
+    def _scan_steps(self, steps: List[TestStep]) -> Tuple[str, Optional[str], Optional[Tuple[int, int, int]]]:
+        """Extract test data, the last meaningful expected result and (gain, offset, raw).
+        
+        The calculation inputs are the first gain, offset and raw values found,
+        in step order, and are only returned if all three appear.
+        """
         
         test_data_items = []
+        first_values: Dict[str, str] = {}
+        last_expected_result = None
         
         for step in steps:
-            # Look for numeric values, inputs, or specific data in the action
-            action = step.action.lower()
-            
-            # Extract common test data patterns
-            if "gain" in action and "=" in action:
-                # Extract gain value
-                import re
-                gain_match = re.search(r'gain\s*=\s*(\d+)', action, re.IGNORECASE)
-                if gain_match:
-                    test_data_items.append(f"Gain = {gain_match.group(1)}")
+            expected_result = step.expected_result
+            if expected_result and expected_result not in _GENERIC_EXPECTED_RESULTS:
+                last_expected_result = expected_result
             
-            if "offset" in action and "=" in action:
-                # Extract offset value
-                import re
-                offset_match = re.search(r'offset\s*=\s*(\d+)', action, re.IGNORECASE)
-                if offset_match:
-                    test_data_items.append(f"Offset = {offset_match.group(1)}")
-            
-            if "raw" in action and "=" in action:
-                # Extract raw value
-                import re
-                raw_match = re.search(r'raw\s*=\s*(\d+)', action, re.IGNORECASE)
-                if raw_match:
-                    test_data_items.append(f"Raw = {raw_match.group(1)}")
-            
-            if "value" in action and "=" in action:
-                # Extract value
-                import re
-                value_match = re.search(r'value\s*=\s*(\d+)', action, re.IGNORECASE)
-                if value_match:
-                    test_data_items.append(f"Value = {value_match.group(1)}")
+            # Look for numeric values, inputs, or specific data in the action
+            for label, pattern in _TEST_DATA_PATTERNS:
+                match = pattern.search(step.action)
+                if match:
+                    value = match.group(1)
+                    test_data_items.append(f"{label} = {value}")
+                    first_values.setdefault(label, value)
+        
+        calculation = None
+        if "Gain" in first_values and "Offset" in first_values and "Raw" in first_values:
+            calculation = (int(first_values["Gain"]), int(first_values["Offset"]), int(first_values["Raw"]))
         
         # If no specific test data found, use generic values
         if not test_data_items:
             test_data_items = ["Input values as specified in steps"]
         
-        return ", ".join(test_data_items)
+        return ", ".join(test_data_items), last_expected_result, calculation
     
-    def _extract_expected_result(self, steps: List[TestStep]) -> str:
-        """Extract expected result from the last step or calculate from test data."""
+    def _extract_expected_result(self, steps: List[TestStep], last_expected_result: Optional[str],
+                                 calculation: Optional[Tuple[int, int, int]]) -> str:
+        """Pick the last meaningful expected result or calculate one from test data."""
         
         if not steps:
             return "Test completes successfully"
         
-        # Look for the last step with a meaningful expected result
-        for step in reversed(steps):
-            if step.expected_result and step.expected_result not in ["Precondition satisfied", "Action completed", "Expected result achieved"]:
-                return step.expected_result
+        # Prefer the last step with a meaningful expected result
+        if last_expected_result:
+            return last_expected_result
         
         # If no specific expected result, try to calculate from test data
-        test_data = self._extract_test_data(steps)
-        
-        # Look for calculation patterns
-        if "gain" in test_data.lower() and "offset" in test_data.lower() and "raw" in test_data.lower():
-            # Extract values for calculation
-            import re
-            gain_match = re.search(r'gain\s*=\s*(\d+)', test_data, re.IGNORECASE)
-            offset_match = re.search(r'offset\s*=\s*(\d+)', test_data, re.IGNORECASE)
-            raw_match = re.search(r'raw\s*=\s*(\d+)', test_data, re.IGNORECASE)
-            
-            if gain_match and offset_match and raw_match:
-                gain = int(gain_match.group(1))
-                offset = int(offset_match.group(1))
-                raw = int(raw_match.group(1))
-                final_value = (raw * gain) + offset
-                return f"Final Value = ({raw} × {gain}) + {offset} = {final_value}, displayed correctly"
+        if calculation:
+            gain, offset, raw = calculation
+            final_value = (raw * gain) + offset
+            return f"Final Value = ({raw} × {gain}) + {offset} = {final_value}, displayed correctly"
         
         return "Expected result as specified in test steps"
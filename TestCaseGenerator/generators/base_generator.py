@@ -2,10 +2,11 @@
 
 import logging
 import re
+import time
 import uuid
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import Iterator, List, Dict, Any, Optional
 
 from integrations.llm_client import LLMClient
 from models.input_models import TestCaseRequest
@@ -15,6 +16,37 @@ from parsers.acceptance_criteria_parser import AcceptanceCriteriaParser
 
 logger = logging.getLogger(__name__)
 
+_KEYWORD_RE = re.compile(r'\b[A-Za-z][A-Za-z0-9_]*\b')
+# Every ASCII non-word character becomes a separator, so ASCII tokens from
+# str.split() are exactly the \w runs _KEYWORD_RE would see
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in map(chr, range(128)) if not (c.isalnum() or c == '_')})
+_COMMON_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
+    'could', 'can', 'may', 'might', 'must', 'shall', 'given', 'when', 'then',
+    'user', 'system', 'able', 'that'
+})
+_EDGE_VOCAB = re.compile(
+    r'\b(?:empty|null|none|zero|maximum|minimum|limit|boundary|invalid|wrong|incorrect|'
+    r'timeout|expired|stale|concurrent|simultaneous|parallel|offline|disconnected|unavailable|'
+    r'permission|access|authorization|performance|slow|fast|response time|'
+    r'negative|error|exception|edge|corner)\b',
+    re.IGNORECASE
+)
+_TC_STRICT = re.compile(r'TEST_CASE_(\d+):\s*(.+?)\n\nGIVEN\s+(.+?)\nWHEN\s+(.+?)\nTHEN\s+(.+?)(?=\n\nTEST_CASE_|\Z)', re.DOTALL)
+_TC_LOOSE = re.compile(r'TEST_CASE_(\d+):\s*(.+?)\nGIVEN\s+(.+?)\nWHEN\s+(.+?)\nTHEN\s+(.+?)(?=\nTEST_CASE_|\Z)', re.DOTALL)
+_OLD_SECTION_RE = re.compile(r'\*\*Test Case \d+:\s*(.*?)(?=\*\*Test Case \d+:|\Z)', re.DOTALL)
+_GHERKIN_SECTION_RE = re.compile(r'\*\*Test Case \d+:\s*')
+_FENCE_RE = re.compile(r'```(?:gherkin)?\n?')
+_SCENARIO_SPLIT_RE = re.compile(r'\n\s*Scenario(?:\s+Outline)?:')
+_OUTLINE_SPLIT_RE = re.compile(r'\n\s*Scenario\s+Outline:')
+_STEP_PREFIXES = (("Given ", "Given"), ("When ", "When"), ("Then ", "Then"), ("And ", "And"))
+_SKIP_PREFIXES = ("Examples:", "|", "Background:", "Feature:", "- ", "Reading:", "Threshold:", "Sensor type:")
+_HEADING_RE = re.compile(r'^#+\s*')
+_NUMBERED_STEP_RE = re.compile(r'^\d+\.')
+_BULLET_STEP_RE = re.compile(r'^[-*•]')
+
 
 class BaseTestGenerator(ABC):
     """Abstract base class for test case generators."""
@@ -26,6 +58,10 @@ class BaseTestGenerator(ABC):
         
         # Test case counter for generating unique IDs
         self._test_counter = 0
+        
+        # Date part of test IDs, reformatted only after local midnight
+        self._date_stamp = ""
+        self._date_stamp_expires = 0.0
     
     @abstractmethod
     async def generate(self, request: TestCaseRequest) -> List[TestCase]:
@@ -37,59 +73,42 @@ class BaseTestGenerator(ABC):
         if not text:
             return []
         
-        # Extract technical terms, actions, and objects
-        words = re.findall(r'\b[A-Za-z][A-Za-z0-9_]*\b', text)
-        
-        # Filter out common words
-        common_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-            'could', 'can', 'may', 'might', 'must', 'shall', 'given', 'when', 'then',
-            'user', 'system', 'should', 'will', 'must', 'can', 'able', 'to', 'that'
-        }
-        
         keywords = []
-        for word in words:
-            word_lower = word.lower()
-            if (word_lower not in common_words and 
-                len(word) > 2 and 
-                not word.isdigit() and
-                word_lower not in keywords):
-                keywords.append(word_lower)
-        
-        return keywords[:20]  # Limit to top 20 keywords
+        seen = set()
+        for token in text.translate(_PUNCT_TABLE).split():
+            if token.isascii():
+                # A keyword must start with a letter, not a digit or underscore
+                if not token[0].isalpha():
+                    continue
+                words = (token,)
+            else:
+                # Unicode letters and punctuation change the word boundaries
+                words = _KEYWORD_RE.findall(token)
+            
+            for word in words:
+                word_lower = word.lower()
+                if len(word) > 2 and word_lower not in _COMMON_WORDS and word_lower not in seen:
+                    seen.add(word_lower)
+                    keywords.append(word_lower)
+                    if len(keywords) == 20:  # Limit to top 20 keywords
+                        return keywords
+        
+        return keywords
     
     def _identify_edge_cases(self, criteria: List[str]) -> List[str]:
         """Identify potential edge cases from acceptance criteria."""
-        edge_cases = []
-        
-        edge_case_patterns = [
-            r'\b(empty|null|none|zero)\b',
-            r'\b(maximum|minimum|limit|boundary)\b',
-            r'\b(invalid|invalid|wrong|incorrect)\b',
-            r'\b(timeout|expired|stale)\b',
-            r'\b(concurrent|simultaneous|parallel)\b',
-            r'\b(offline|disconnected|unavailable)\b',
-            r'\b(permission|access|authorization)\b',
-            r'\b(performance|slow|fast|response time)\b',
-            r'\b(negative|error|exception)\b',
-            r'\b(boundary|edge|corner)\b'
-        ]
-        
-        for criterion in criteria:
-            for pattern in edge_case_patterns:
-                if re.search(pattern, criterion, re.IGNORECASE):
-                    edge_cases.append(criterion)
-                    break
-        
-        return edge_cases
+        return [criterion for criterion in criteria if _EDGE_VOCAB.search(criterion)]
     
     def _generate_test_id(self, prefix: str = "TC") -> str:
         """Generate a unique test case ID."""
         self._test_counter += 1
-        timestamp = datetime.now().strftime("%Y%m%d")
-        return f"{prefix}-{timestamp}-{self._test_counter:03d}"
+        now = time.time()
+        if now >= self._date_stamp_expires:
+            today = datetime.fromtimestamp(now)
+            midnight = today.replace(hour=0, minute=0, second=0, microsecond=0)
+            self._date_stamp = today.strftime("%Y%m%d")
+            self._date_stamp_expires = (midnight + timedelta(days=1)).timestamp()
+        return f"{prefix}-{self._date_stamp}-{self._test_counter:03d}"
     
     def _create_test_step(self, step_number: int, action: str, expected_result: str, 
                          test_data: Optional[str] = None, notes: Optional[str] = None) -> TestStep:
@@ -201,7 +220,7 @@ class BaseTestGenerator(ABC):
         keywords = self._extract_keywords(" ".join(request.acceptance_criteria.criteria_list))
         tags.extend(keywords[:5])  # Add top 5 keywords as tags
         
-        return list(set(tags))  # Remove duplicates
+        return list(dict.fromkeys(tags))  # Remove duplicates, keeping order
     
     def _validate_test_case(self, test_case: TestCase) -> Dict[str, Any]:
         """Validate a generated test case."""
@@ -225,12 +244,13 @@ class BaseTestGenerator(ABC):
             validation_result["is_valid"] = False
         
         # Check step quality
-        for i, step in enumerate(test_case.steps):
-            if not step.action or len(step.action.strip()) < 5:
-                validation_result["warnings"].append(f"Step {i+1} action could be more specific")
+        warnings = validation_result["warnings"]
+        for i, step in enumerate(test_case.steps, 1):
+            if len((step.action or "").strip()) < 5:
+                warnings.append(f"Step {i} action could be more specific")
             
-            if not step.expected_result or len(step.expected_result.strip()) < 5:
-                validation_result["warnings"].append(f"Step {i+1} expected result could be more specific")
+            if len((step.expected_result or "").strip()) < 5:
+                warnings.append(f"Step {i} expected result could be more specific")
         
         # Check for missing critical information
         if not test_case.tags:
@@ -295,33 +315,42 @@ class BaseTestGenerator(ABC):
             logger.error(f"LLM generation failed: {e}")
             raise
     
-    def _parse_llm_response(self, response: str, request: TestCaseRequest) -> List[TestCase]:
-        """Parse LLM response into structured test cases."""
-        test_cases = []
-        
+    def _iter_test_case_matches(self, response: str) -> Iterator[re.Match]:
+        """Yield TEST_CASE_X matches, falling back to the loose layout if the strict one finds none."""
+        count = 0
         try:
             logger.info("Starting LLM response parsing")
             
+            # Neither layout can match without the marker, so skip both scans
+            if "TEST_CASE_" not in response:
+                logger.info("Total matches found: 0")
+                return
+            
             # Parse the simple TEST_CASE_X format
-            test_case_pattern = r'TEST_CASE_(\d+):\s*(.+?)\n\nGIVEN\s+(.+?)\nWHEN\s+(.+?)\nTHEN\s+(.+?)(?=\n\nTEST_CASE_|\Z)'
-            matches = re.findall(test_case_pattern, response, re.DOTALL)
+            for match in _TC_STRICT.finditer(response):
+                count += 1
+                yield match
             
-            logger.info(f"First pattern found {len(matches)} matches")
+            logger.info(f"First pattern found {count} matches")
             
             # If no matches, try a simpler pattern
-            if not matches:
-                test_case_pattern = r'TEST_CASE_(\d+):\s*(.+?)\nGIVEN\s+(.+?)\nWHEN\s+(.+?)\nTHEN\s+(.+?)(?=\nTEST_CASE_|\Z)'
-                matches = re.findall(test_case_pattern, response, re.DOTALL)
-                logger.info(f"Second pattern found {len(matches)} matches")
+            if not count:
+                for match in _TC_LOOSE.finditer(response):
+                    count += 1
+                    yield match
+                logger.info(f"Second pattern found {count} matches")
             
-            logger.info(f"Total matches found: {len(matches)}")
+            logger.info(f"Total matches found: {count}")
             
         except Exception as e:
             logger.error(f"Error in pattern matching: {e}")
-            matches = []
+    
+    def _parse_llm_response(self, response: str, request: TestCaseRequest) -> List[TestCase]:
+        """Parse LLM response into structured test cases."""
+        test_cases = []
         
-        for match in matches:
-            case_num, title, given, when, then = match
+        for match in self._iter_test_case_matches(response):
+            case_num, title, given, when, then = match.groups()
             
             # Clean up the title
             title = title.strip()
@@ -376,51 +405,52 @@ class BaseTestGenerator(ABC):
                 test_cases.append(test_case)
         
         # If no test cases found with new format, try old format
-        if not test_cases:
+        if not test_cases and "**Test Case" in response:
             # Try old format parsing
-            sections = re.split(r'\*\*Test Case \d+:', response)
-            
-            if len(sections) > 1:
-                for i, section in enumerate(sections[1:], 1):
-                    if not section.strip():
+            for i, match in enumerate(_OLD_SECTION_RE.finditer(response), 1):
+                section = match.group(1)
+                if not section.strip():
+                    continue
+                
+                lines = section.strip().split('\n')
+                title = lines[0].strip() if lines else f"Test Case {i}"
+                title = title.replace('**', '').strip()
+                
+                steps = []
+                step_number = 1
+                
+                for line in lines:
+                    line = line.strip()
+                    for prefix, keyword in _STEP_PREFIXES:
+                        if line.startswith(prefix):
+                            action = line[len(prefix):].strip()
+                            break
+                    else:
                         continue
-                    
-                    lines = section.strip().split('\n')
-                    title = lines[0].strip() if lines else f"Test Case {i}"
-                    title = re.sub(r'\*\*', '', title).strip()
-                    
-                    steps = []
-                    step_number = 1
-                    
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith(("Given ", "When ", "Then ", "And ")):
-                            keyword = line.split()[0]
-                            action = line[len(keyword)+1:].strip()
-                            
-                            step = self._create_test_step(
-                                step_number=step_number,
-                                action=action,
-                                expected_result="Step completed successfully" if keyword in ["Then", "And"] else "Precondition satisfied",
-                                notes=f"{keyword} step"
-                            )
-                            steps.append(step)
-                            step_number += 1
-                    
-                    if steps:
-                        test_case = TestCase(
-                            test_id=self._generate_test_id("TC"),
-                            title=title,
-                            description=f"Test case generated from LLM: {title}",
-                            test_type=TestType.FUNCTIONAL,
-                            priority=TestPriority.MEDIUM,
-                            test_level=request.test_specification.test_level,
-                            steps=steps,
-                            tags=["llm-generated", "functional"],
-                            requirements=[f"Generated from JIRA ticket: {request.jira_ticket_id}"] if request.jira_ticket_id else [],
-                            jira_ticket_id=request.jira_ticket_id
-                        )
-                        test_cases.append(test_case)
+                        
+                    step = self._create_test_step(
+                        step_number=step_number,
+                        action=action,
+                        expected_result="Step completed successfully" if keyword in ["Then", "And"] else "Precondition satisfied",
+                        notes=f"{keyword} step"
+                    )
+                    steps.append(step)
+                    step_number += 1
+                
+                if steps:
+                    test_case = TestCase(
+                        test_id=self._generate_test_id("TC"),
+                        title=title,
+                        description=f"Test case generated from LLM: {title}",
+                        test_type=TestType.FUNCTIONAL,
+                        priority=TestPriority.MEDIUM,
+                        test_level=request.test_specification.test_level,
+                        steps=steps,
+                        tags=["llm-generated", "functional"],
+                        requirements=[f"Generated from JIRA ticket: {request.jira_ticket_id}"] if request.jira_ticket_id else [],
+                        jira_ticket_id=request.jira_ticket_id
+                    )
+                    test_cases.append(test_case)
         
         return test_cases
     
@@ -429,21 +459,22 @@ class BaseTestGenerator(ABC):
         test_cases = []
         
         # Remove markdown code blocks
-        response = re.sub(r'```gherkin\n?', '', response)
-        response = re.sub(r'```\n?', '', response)
+        response = _FENCE_RE.sub('', response)
         
         # Remove explanatory text before Gherkin content
-        # Look for the first occurrence of "Feature:" or "Scenario:"
-        feature_match = re.search(r'Feature:', response)
-        scenario_match = re.search(r'Scenario:', response)
+        # Look for the first occurrence of "Feature:", falling back to "Scenario:"
+        start = response.find("Feature:")
+        if start < 0:
+            start = response.find("Scenario:")
         
-        if feature_match:
-            response = response[feature_match.start():]
-        elif scenario_match:
-            response = response[scenario_match.start():]
+        if start > 0:
+            response = response[start:]
         
         # Split by test case sections (look for **Test Case X:** patterns)
-        test_case_sections = re.split(r'\*\*Test Case \d+:\s*', response)
+        if "**Test Case" in response:
+            test_case_sections = _GHERKIN_SECTION_RE.split(response)
+        else:
+            test_case_sections = [response]
         
         if len(test_case_sections) > 1:
             # Parse each test case section
@@ -460,11 +491,11 @@ class BaseTestGenerator(ABC):
                     continue
         else:
             # Fallback to scenario-based parsing
-            scenarios = re.split(r'\n\s*Scenario(?:\s+Outline)?:', response)
+            scenarios = _SCENARIO_SPLIT_RE.split(response) if "Scenario" in response else [response]
             
             # Also try splitting by "Scenario Outline:" specifically
             if len(scenarios) == 1 and "Scenario Outline:" in response:
-                scenarios = re.split(r'\n\s*Scenario\s+Outline:', response)
+                scenarios = _OUTLINE_SPLIT_RE.split(response)
             
             logger.debug(f"Found {len(scenarios)} scenario sections")
             
@@ -501,8 +532,8 @@ class BaseTestGenerator(ABC):
         # Extract title from first line, clean it up
         title = lines[0].strip()
         # Remove any markdown formatting
-        title = re.sub(r'\*\*', '', title)
-        title = re.sub(r'^#+\s*', '', title)
+        title = title.replace('**', '')
+        title = _HEADING_RE.sub('', title)
         title = title.strip()
         
         # Look for Gherkin content in the section
@@ -553,32 +584,32 @@ class BaseTestGenerator(ABC):
                 continue
             
             # Skip Examples, Background, and other non-step lines
-            if (line.startswith("Examples:") or line.startswith("|") or 
-                line.startswith("Background:") or line.startswith("Feature:") or
-                line.startswith("- ") or line.startswith("Reading:") or 
-                line.startswith("Threshold:") or line.startswith("Sensor type:")):
+            if line.startswith(_SKIP_PREFIXES):
                 continue
             
             # Parse Given/When/Then/And steps
-            if line.startswith(("Given ", "When ", "Then ", "And ")):
-                keyword = line.split()[0]
-                action = line[len(keyword)+1:].strip()  # Remove keyword and space
-                
-                # Handle "And" steps by using the previous keyword context
-                if keyword == "And":
-                    if steps:
-                        keyword = "And"  # Keep as "And" for clarity
-                    else:
-                        keyword = "Given"  # Default to Given if no previous context
-                
-                step = self._create_test_step(
-                    step_number=step_number,
-                    action=action,
-                    expected_result="Step completed successfully" if keyword in ["Then", "And"] else "Precondition satisfied",
-                    notes=f"{keyword} step"
-                )
-                steps.append(step)
-                step_number += 1
+            for prefix, keyword in _STEP_PREFIXES:
+                if line.startswith(prefix):
+                    action = line[len(prefix):].strip()  # Remove keyword and space
+                    break
+            else:
+                continue
+            
+            # Handle "And" steps by using the previous keyword context
+            if keyword == "And":
+                if steps:
+                    keyword = "And"  # Keep as "And" for clarity
+                else:
+                    keyword = "Given"  # Default to Given if no previous context
+            
+            step = self._create_test_step(
+                step_number=step_number,
+                action=action,
+                expected_result="Step completed successfully" if keyword in ["Then", "And"] else "Precondition satisfied",
+                notes=f"{keyword} step"
+            )
+            steps.append(step)
+            step_number += 1
         
         if not steps:
             return None
@@ -625,7 +656,7 @@ class BaseTestGenerator(ABC):
                 continue
             
             # Look for step patterns
-            if re.match(r'^\d+\.', line) or re.match(r'^[-*•]', line):
+            if _NUMBERED_STEP_RE.match(line) or _BULLET_STEP_RE.match(line):
                 # Extract action and expected result
                 parts = line.split(':', 1)
                 if len(parts) == 2:
@@ -1,6 +1,7 @@
 """Jira REST API client for fetching user stories and acceptance criteria."""
 
 import asyncio
+import json
 import logging
 import os
 import random
@@ -11,6 +12,12 @@ from urllib.parse import urljoin
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+try:
+    # orjson decodes large rich-text Jira payloads several times faster
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Change the relative import
 # Fix imports to use absolute paths
 from config.settings import JiraConfig
@@ -69,12 +76,12 @@ class JiraClient:
             # Fetch issue details
             issue_response = await self.client.get(f"/rest/api/3/issue/{ticket_id}")
             issue_response.raise_for_status()
-            issue_data = issue_response.json()
+            issue_data = _json_loads(issue_response.content)
             
             # Fetch issue fields
             fields_response = await self.client.get(f"/rest/api/3/issue/{ticket_id}?expand=names,schema")
             fields_response.raise_for_status()
-            fields_data = fields_response.json()
+            fields_data = _json_loads(fields_response.content)
             
             # Parse the ticket
             ticket = self._parse_jira_ticket(issue_data, fields_data)
@@ -116,7 +123,7 @@ class JiraClient:
             
             response = await self.client.get("/rest/api/3/search", params=params)
             response.raise_for_status()
-            search_data = response.json()
+            search_data = _json_loads(response.content)
             
             tickets = []
             for issue in search_data.get("issues", []):
@@ -615,7 +622,7 @@ class JiraClient:
         try:
             response = await self.client.get("/rest/api/3/myself")
             response.raise_for_status()
-            user_data = response.json()
+            user_data = _json_loads(response.content)
             logger.info(f"Successfully connected to Jira as {user_data.get('displayName', 'Unknown')}")
             return True
         except Exception as e:
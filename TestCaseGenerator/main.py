@@ -11,7 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
-from config.settings import config, get_llm_config, get_jira_config, AppConfig
+from config.settings import get_llm_config, AppConfig
 from integrations.llm_client import LLMClient
 from integrations.jira_client import JiraClient
 
@@ -210,24 +210,26 @@ def generate(criteria_type, criteria, persona, action, value, tech, data, constr
 def generate_from_jira(ticket_id, out_format, types, level, priority, provider, mode, output_path, story_format, extract_context, context_detail):
     """Generate test cases by pulling data from Jira."""
     # Set the mode in the config
-    config = AppConfig()
-    config.MODE = mode
+    config = AppConfig(MODE=mode)
     jira_conf = config.get_jira_config()
     
     if mode == "online" and not jira_conf.base_url:
         raise click.ClickException("Jira config not available. Provide JIRA_* env vars or use --mode local.")
 
     async def _run():
+        nonlocal jira_conf
         if mode == "local":
             # Create a dummy config with the specified story format
-            jira_conf.user_story_format = story_format
+            jira_conf = jira_conf.model_copy(update={"user_story_format": story_format})
             jira_client = JiraClient(jira_conf)
             ticket = jira_client.generate_dummy_ticket(ticket_id)
         else:
             # Update the config with the specified parameters
-            jira_conf.user_story_format = story_format
-            jira_conf.extract_context = extract_context
-            jira_conf.context_detail_level = context_detail
+            jira_conf = jira_conf.model_copy(update={
+                "user_story_format": story_format,
+                "extract_context": extract_context,
+                "context_detail_level": context_detail,
+            })
             jira_client = JiraClient(jira_conf)  # type: ignore
             ticket = await jira_client.fetch_ticket(ticket_id)
         try:
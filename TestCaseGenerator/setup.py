@@ -1,13 +1,45 @@
+import os
+
 from setuptools import setup, find_packages
 
+# Optionally compile the hot formatting modules with mypyc
+# (TESTCASEGEN_USE_MYPYC=1 pip install .)
+ext_modules = []
+if os.environ.get("TESTCASEGEN_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify([
+        # Module names are resolved from this directory, matching the
+        # top-level imports; modules outside the compiled set (e.g. the
+        # pydantic models) are followed for types but not reported on
+        "--explicit-package-bases",
+        "--follow-imports=silent",
+        "formatters/code_skeleton_formatter.py",
+        "formatters/gherkin_formatter.py",
+    ])
+
 setup(
     name="TestCaseGenerator",
     version="0.1",
     packages=find_packages(),
+    py_modules=["main", "fetch_jira_tickets"],
     install_requires=[
         "httpx",
         "python-dotenv",
         "tenacity",
     ],
+    extras_require={
+        # Optional C accelerators; the code falls back to the stdlib without them
+        "fast": [
+            "orjson>=3.9.10",
+            "pyahocorasick>=2.0.0",
+        ],
+    },
+    ext_modules=ext_modules,
     python_requires=">=3.8",
+    entry_points={
+        "console_scripts": [
+            "fetch-jira-tickets=fetch_jira_tickets:main",
+        ],
+    },
 )
\ No newline at end of file